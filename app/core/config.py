@@ -1,3 +1,4 @@
+import os
 from functools import lru_cache
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -10,9 +11,53 @@ class Settings(BaseSettings):
         default="postgresql+psycopg2://cobranca:cobranca@db:5432/cobranca",
         env="DATABASE_URL",
     )
+    async_database_url: str | None = Field(default=None, env="ASYNC_DATABASE_URL")
+    read_database_url: str | None = Field(default=None, env="READ_DATABASE_URL")
+    async_read_database_url: str | None = Field(default=None, env="ASYNC_READ_DATABASE_URL")
+    replica_max_lag_seconds: float = Field(default=10, env="REPLICA_MAX_LAG_SECONDS")
+    replica_check_interval_seconds: float = Field(
+        default=5, env="REPLICA_CHECK_INTERVAL_SECONDS"
+    )
+    db_pool_size: int = Field(default=5, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, env="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30, env="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(default=1800, env="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(default=True, env="DB_POOL_PRE_PING")
+    db_statement_timeout_ms: int = Field(default=0, env="DB_STATEMENT_TIMEOUT_MS")
     jwt_secret_key: str = Field(default="change-me", env="JWT_SECRET_KEY")
     jwt_algorithm: str = "HS256"
     jwt_expires_minutes: int = 60 * 8
+    bcrypt_rounds: int = Field(default=12, env="BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(default=2, env="PASSWORD_HASH_WORKERS")
+    password_hash_queue_size: int = Field(default=16, env="PASSWORD_HASH_QUEUE_SIZE")
+    user_cache_max_size: int = Field(default=1024, env="USER_CACHE_MAX_SIZE")
+    user_cache_ttl_seconds: float = Field(default=60, env="USER_CACHE_TTL_SECONDS")
+    dimension_cache_max_size: int = Field(default=100_000, env="DIMENSION_CACHE_MAX_SIZE")
+    fingerprint_cache_max_size: int = Field(default=0, env="FINGERPRINT_CACHE_MAX_SIZE")
+    import_workers: int = Field(default=2, env="IMPORT_WORKERS")
+    parse_workers: int = Field(default=os.cpu_count() or 2, env="PARSE_WORKERS")
+    snapshot_encoding: str = Field(default="columnar", env="SNAPSHOT_ENCODING")
+    snapshot_delta_max_chain: int = Field(default=30, env="SNAPSHOT_DELTA_MAX_CHAIN")
+    history_page_size: int = Field(default=50, env="HISTORY_PAGE_SIZE")
+    history_max_page_size: int = Field(default=500, env="HISTORY_MAX_PAGE_SIZE")
+    invoice_partitioning: bool = Field(default=False, env="INVOICE_PARTITIONING")
+    invoice_partition_months_ahead: int = Field(default=3, env="INVOICE_PARTITION_MONTHS_AHEAD")
+    invoice_partition_retention_months: int = Field(
+        default=0, env="INVOICE_PARTITION_RETENTION_MONTHS"
+    )
+    delivery_provider: str = Field(default="", env="DELIVERY_PROVIDER")
+    delivery_worker_enabled: bool = Field(default=False, env="DELIVERY_WORKER_ENABLED")
+    delivery_concurrency: int = Field(default=20, env="DELIVERY_CONCURRENCY")
+    delivery_rate_per_second: float = Field(default=10, env="DELIVERY_RATE_PER_SECOND")
+    delivery_burst: int = Field(default=20, env="DELIVERY_BURST")
+    delivery_max_attempts: int = Field(default=5, env="DELIVERY_MAX_ATTEMPTS")
+    delivery_retry_base_seconds: float = Field(default=30, env="DELIVERY_RETRY_BASE_SECONDS")
+    delivery_retry_max_seconds: float = Field(default=3600, env="DELIVERY_RETRY_MAX_SECONDS")
+    delivery_lease_seconds: float = Field(default=300, env="DELIVERY_LEASE_SECONDS")
+    delivery_poll_seconds: float = Field(default=2, env="DELIVERY_POLL_SECONDS")
+    delivery_batch_size: int = Field(default=200, env="DELIVERY_BATCH_SIZE")
+    import_storage_dir: str = Field(default="/tmp/cobranca-imports", env="IMPORT_STORAGE_DIR")
+    import_stale_seconds: float = Field(default=1800, env="IMPORT_STALE_SECONDS")
 
     class Config:
         env_file = ".env"
@@ -1,14 +1,86 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.core.config import get_settings
+from app.core.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+
+def _async_url(url: str) -> str:
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if "+psycopg2" in url:
+        return url.replace("+psycopg2", "+asyncpg", 1)
+    return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    options = {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    if not url.startswith("postgresql"):
+        return options
+    options.update(
+        {
+            "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+        }
+    )
+    if settings.db_statement_timeout_ms:
+        timeout = str(settings.db_statement_timeout_ms)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+engine = create_engine(settings.database_url, **_engine_options(settings.database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+async_database_url = settings.async_database_url or _async_url(settings.database_url)
+async_engine = create_async_engine(
+    async_database_url, **_engine_options(async_database_url, is_async=True)
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+read_database_url = settings.read_database_url
+read_engine = (
+    create_engine(read_database_url, **_engine_options(read_database_url))
+    if read_database_url
+    else engine
+)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+async_read_database_url = settings.async_read_database_url or (
+    _async_url(read_database_url) if read_database_url else None
+)
+async_read_engine = (
+    create_async_engine(
+        async_read_database_url, **_engine_options(async_read_database_url, is_async=True)
+    )
+    if async_read_database_url
+    else async_engine
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
+def dialect_insert(db, model):
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
 
 def get_db():
     db = SessionLocal()
@@ -16,3 +88,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,29 +1,79 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.security import decode_token
+from app.core.user_cache import CachedUser, user_cache
 from app.models import User
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def _token_user_id(token: str) -> int:
     payload = decode_token(token)
     if not payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
-    user = db.query(User).filter(User.id == int(payload["sub"])).first()
+    return int(payload["sub"])
+
+
+def _principal(user: User | None) -> CachedUser:
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
+    return user_cache.set(CachedUser.from_user(user))
+
+
+def get_current_principal(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> CachedUser:
+    user_id = _token_user_id(token)
+    cached = user_cache.get(user_id)
+    if cached:
+        return cached
+    return _principal(db.query(User).filter(User.id == user_id).first())
+
+
+# Rotas async def usam esta versão: uma dependência síncrona ainda ocuparia uma thread do
+# threadpool e uma conexão do pool síncrono.
+async def get_current_principal_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> CachedUser:
+    user_id = _token_user_id(token)
+    cached = user_cache.get(user_id)
+    if cached:
+        return cached
+    return _principal(await db.get(User, user_id))
+
+
+def get_current_user(
+    principal: CachedUser = Depends(get_current_principal), db: Session = Depends(get_db)
+) -> User:
+    user = db.query(User).filter(User.id == principal.id).first()
     if not user:
+        user_cache.invalidate(principal.id)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
     return user
 
 
+def _check_role(principal: CachedUser, roles: tuple[str, ...]) -> CachedUser:
+    if principal.role not in roles:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
+    return principal
+
+
 def require_role(*roles: str):
-    def _role_dependency(user: User = Depends(get_current_user)) -> User:
-        if user.role not in roles:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
-        return user
+    def _role_dependency(principal: CachedUser = Depends(get_current_principal)) -> CachedUser:
+        return _check_role(principal, roles)
+
+    return _role_dependency
+
+
+def require_role_async(*roles: str):
+    async def _role_dependency(
+        principal: CachedUser = Depends(get_current_principal_async),
+    ) -> CachedUser:
+        return _check_role(principal, roles)
 
     return _role_dependency
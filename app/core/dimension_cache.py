@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class DimensionCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[Hashable]) -> tuple[dict[Hashable, int], list[Hashable]]:
+        found: dict[Hashable, int] = {}
+        missing: list[Hashable] = []
+        with self._lock:
+            for key in keys:
+                value = self._entries.get(key)
+                if value is None:
+                    missing.append(key)
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def set_many(self, values: dict[Hashable, int]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+client_cache = DimensionCache(settings.dimension_cache_max_size)
+vendor_cache = DimensionCache(settings.dimension_cache_max_size)
+client_vendor_cache = DimensionCache(settings.dimension_cache_max_size)
+# Fingerprint de linha → id da fatura; desligado por padrão (FINGERPRINT_CACHE_MAX_SIZE=0).
+invoice_fingerprint_cache = DimensionCache(settings.fingerprint_cache_max_size)
+
+
+def stage(db: Session, cache: DimensionCache, values: dict[Hashable, int]) -> None:
+    db.info.setdefault("dimension_cache", []).append((cache, values))
+
+
+# Ids só entram no cache depois do commit; um rollback não deixa ids inexistentes para trás.
+@event.listens_for(Session, "after_commit")
+def _publish_staged(session: Session) -> None:
+    for cache, values in session.info.pop("dimension_cache", []):
+        cache.set_many(values)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_staged(session: Session) -> None:
+    session.info.pop("dimension_cache", None)
@@ -0,0 +1,204 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Iterator
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota.",
+    ["method", "route", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Consultas SQL executadas por requisição.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500),
+)
+EXCEL_PARSE_SECONDS = Histogram(
+    "excel_parse_seconds",
+    "Tempo de leitura e normalização de uma planilha.",
+    ["origem"],
+    buckets=(0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+EXCEL_PARSE_ROWS = Counter("excel_parse_rows_total", "Linhas lidas de planilhas.", ["origem"])
+EXCEL_PARSE_ROWS_PER_SECOND = Histogram(
+    "excel_parse_rows_per_second",
+    "Vazão do parser por planilha (linhas/s).",
+    ["origem"],
+    buckets=(1_000, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 500_000),
+)
+INVOICE_PERSIST_SECONDS = Histogram(
+    "invoice_persist_seconds",
+    "Tempo gasto gravando títulos de um upload.",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+INVOICE_PERSIST_ROWS = Counter(
+    "invoice_persist_rows_total", "Títulos de uploads por resultado.", ["result"]
+)
+SNAPSHOT_BUILD_SECONDS = Histogram(
+    "report_snapshot_build_seconds", "Tempo de montagem de um snapshot.", ["report_type"]
+)
+SNAPSHOT_ROWS = Histogram(
+    "report_snapshot_rows",
+    "Linhas gravadas por snapshot.",
+    ["report_type"],
+    buckets=(0, 10, 100, 1_000, 10_000, 100_000, 1_000_000),
+)
+DELIVERY_SECONDS = Histogram(
+    "delivery_attempt_seconds",
+    "Duração de uma tentativa de envio, incluindo a espera do rate limit.",
+    ["provider"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+DELIVERY_ATTEMPTS = Counter(
+    "delivery_attempts_total", "Tentativas de envio por resultado.", ["provider", "outcome"]
+)
+
+_query_count: ContextVar[list[int] | None] = ContextVar("query_count", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def start_query_count() -> list[int]:
+    counter = [0]
+    _query_count.set(counter)
+    return counter
+
+
+_deferred: ContextVar[list[tuple] | None] = ContextVar("deferred_metrics", default=None)
+_DEFERRABLE: dict[str, Callable[..., None]] = {}
+
+
+@contextmanager
+def deferred() -> Iterator[list[tuple]]:
+    # Nos processos do pool as métricas iriam para um registro que o /metrics da API não lê;
+    # elas ficam nesta lista, voltam ao processo pai no resultado da tarefa e passam por replay().
+    observations: list[tuple] = []
+    token = _deferred.set(observations)
+    try:
+        yield observations
+    finally:
+        _deferred.reset(token)
+
+
+def replay(observations: list[tuple]) -> None:
+    for name, args in observations:
+        _DEFERRABLE[name](*args)
+
+
+def _deferrable(observe: Callable[..., None]) -> Callable[..., None]:
+    _DEFERRABLE[observe.__name__] = observe
+
+    @wraps(observe)
+    def wrapper(*args) -> None:
+        observations = _deferred.get()
+        if observations is None:
+            observe(*args)
+        else:
+            observations.append((observe.__name__, args))
+
+    return wrapper
+
+
+def observe_request(method: str, route: str, status: int, seconds: float, queries: int) -> None:
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(seconds)
+    REQUEST_DB_QUERIES.labels(method, route).observe(queries)
+
+
+@_deferrable
+def observe_parse(origem: str, seconds: float, rows: int) -> None:
+    EXCEL_PARSE_SECONDS.labels(origem).observe(seconds)
+    EXCEL_PARSE_ROWS.labels(origem).inc(rows)
+    if seconds > 0:
+        EXCEL_PARSE_ROWS_PER_SECOND.labels(origem).observe(rows / seconds)
+
+
+@_deferrable
+def observe_persist(
+    seconds: float, inserted: int, duplicates: int, file_duplicates: int = 0
+) -> None:
+    INVOICE_PERSIST_SECONDS.observe(seconds)
+    INVOICE_PERSIST_ROWS.labels("inserted").inc(inserted)
+    INVOICE_PERSIST_ROWS.labels("duplicate").inc(duplicates)
+    INVOICE_PERSIST_ROWS.labels("file_duplicate").inc(file_duplicates)
+
+
+def observe_snapshot(report_type: str, seconds: float, rows: int) -> None:
+    SNAPSHOT_BUILD_SECONDS.labels(report_type).observe(seconds)
+    SNAPSHOT_ROWS.labels(report_type).observe(rows)
+
+
+def observe_delivery(provider: str, outcome: str, seconds: float) -> None:
+    DELIVERY_SECONDS.labels(provider).observe(seconds)
+    DELIVERY_ATTEMPTS.labels(provider, outcome).inc()
+
+
+class _RuntimeCollector:
+    def describe(self):
+        return []
+
+    def collect(self):
+        from app.core.database import async_engine, async_read_engine, engine, read_engine
+        from app.core.dimension_cache import (
+            client_cache,
+            client_vendor_cache,
+            invoice_fingerprint_cache,
+            vendor_cache,
+        )
+        from app.core.pool_metrics import pool_status
+        from app.core.security import password_hasher
+        from app.core.user_cache import user_cache
+
+        pools = GaugeMetricFamily("db_pool", "Estado do pool de conexões.", labels=["engine", "field"])
+        engines = [("sync", engine), ("async", async_engine.sync_engine)]
+        if read_engine is not engine:
+            engines += [("read_sync", read_engine), ("read_async", async_read_engine.sync_engine)]
+        for name, bind in engines:
+            for field, value in pool_status(bind).items():
+                if isinstance(value, (int, float)):
+                    pools.add_metric([name, field], value)
+        yield pools
+
+        cache = GaugeMetricFamily("user_cache", "Cache de usuários autenticados.", labels=["field"])
+        for field, value in user_cache.stats().items():
+            cache.add_metric([field], value)
+        yield cache
+
+        dimensions = GaugeMetricFamily(
+            "dimension_cache",
+            "Caches nome→id de dimensões e fingerprint→id de faturas.",
+            labels=["cache", "field"],
+        )
+        for name, dimension_cache in (
+            ("clients", client_cache),
+            ("vendors", vendor_cache),
+            ("client_vendors", client_vendor_cache),
+            ("invoice_fingerprints", invoice_fingerprint_cache),
+        ):
+            for field, value in dimension_cache.stats().items():
+                dimensions.add_metric([name, field], value)
+        yield dimensions
+
+        hasher = GaugeMetricFamily(
+            "password_hasher", "Executor de hash de senhas.", labels=["field"]
+        )
+        for field, value in password_hasher.stats().items():
+            hasher.add_metric([field], value)
+        yield hasher
+
+
+REGISTRY.register(_RuntimeCollector())
+
+
+def render() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,308 @@
+from typing import Callable
+
+from sqlalchemy import LargeBinary, bindparam, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app import models  # noqa: F401 - registra as tabelas em Base.metadata
+from app.core import partitions
+from app.core.database import Base, engine
+from app.utils.fingerprint import dedup_fingerprint
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _send_history_keyset_index(conn: Connection) -> None:
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_send_history_sent_at_id ON send_history (sent_at, id)")
+    )
+
+
+def _columns(conn: Connection, table: str) -> set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def _invoice_dedup_fingerprint(conn: Connection) -> None:
+    columns = _columns(conn, "invoices")
+    if "dedup_fingerprint" not in columns:
+        column_type = LargeBinary().compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE invoices ADD COLUMN dedup_fingerprint {column_type}"))
+    if "cliente" not in columns:
+        return
+
+    # O índice vem antes do backfill: é por ele que cada lote descobre colisões com o que já
+    # foi gravado, sem carregar a tabela inteira em memória.
+    conn.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_invoice_fingerprint "
+            "ON invoices (dedup_fingerprint)"
+        )
+    )
+    conn.commit()
+
+    # Linhas que só diferem por caixa/espaços passam a colidir; a primeira fica com o
+    # fingerprint e as demais ficam com NULL, fora do índice único. Cada lote é commitado,
+    # então uma migração interrompida continua de onde parou.
+    pending = text(
+        "SELECT id, cliente, data_vencimento, valor_original, descricao, origem "
+        "FROM invoices WHERE dedup_fingerprint IS NULL AND id > :last ORDER BY id LIMIT :limit"
+    )
+    existing = text(
+        "SELECT dedup_fingerprint FROM invoices WHERE dedup_fingerprint IN :fingerprints"
+    ).bindparams(bindparam("fingerprints", expanding=True))
+    last = 0
+    while True:
+        rows = conn.execute(pending, {"last": last, "limit": BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            break
+        last = rows[-1][0]
+        fingerprints = {}
+        for invoice_id, *key in rows:
+            fingerprints.setdefault(dedup_fingerprint(*key), invoice_id)
+        taken = {
+            bytes(fingerprint)
+            for fingerprint in conn.execute(
+                existing, {"fingerprints": list(fingerprints)}
+            ).scalars()
+        }
+        updates = [
+            {"id": invoice_id, "fingerprint": fingerprint}
+            for fingerprint, invoice_id in fingerprints.items()
+            if fingerprint not in taken
+        ]
+        if updates:
+            conn.execute(
+                text("UPDATE invoices SET dedup_fingerprint = :fingerprint WHERE id = :id"),
+                updates,
+            )
+        conn.commit()
+
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE invoices DROP CONSTRAINT IF EXISTS uq_invoice_dedup"))
+
+
+def _import_batch_file_duplicates(conn: Connection) -> None:
+    if "skipped_file_duplicates" not in _columns(conn, "import_batches"):
+        conn.execute(
+            text(
+                "ALTER TABLE import_batches "
+                "ADD COLUMN skipped_file_duplicates INTEGER NOT NULL DEFAULT 0"
+            )
+        )
+
+
+INVOICE_COLUMNS = (
+    "id, client_id, data_vencimento, descricao, valor_original, vendor_id, origem, "
+    "dedup_fingerprint, created_at"
+)
+
+
+def _rebuild_sqlite_invoices(conn: Connection) -> None:
+    # SQLite não remove colunas presas a constraints (uq_invoice_dedup); a tabela é recriada.
+    for index in inspect(conn).get_indexes("invoices"):
+        conn.execute(text(f"DROP INDEX {index['name']}"))
+    conn.execute(text("ALTER TABLE invoices RENAME TO invoices_legacy"))
+    conn.execute(
+        text(
+            "CREATE TABLE invoices ("
+            "id INTEGER NOT NULL, "
+            "client_id INTEGER NOT NULL, "
+            "data_vencimento DATE NOT NULL, "
+            "descricao VARCHAR(255) NOT NULL, "
+            "valor_original NUMERIC(12, 2) NOT NULL, "
+            "vendor_id INTEGER NOT NULL, "
+            "origem VARCHAR(50) NOT NULL, "
+            "dedup_fingerprint BLOB, "
+            "created_at DATETIME, "
+            "PRIMARY KEY (id), "
+            "CONSTRAINT ck_invoice_value_positive CHECK (valor_original > 0), "
+            "FOREIGN KEY (client_id) REFERENCES clients (id), "
+            "FOREIGN KEY (vendor_id) REFERENCES vendors (id))"
+        )
+    )
+    conn.execute(text("CREATE UNIQUE INDEX uq_invoice_fingerprint ON invoices (dedup_fingerprint)"))
+    conn.execute(text("CREATE INDEX ix_invoices_data_vencimento ON invoices (data_vencimento)"))
+    conn.execute(text("CREATE INDEX ix_invoices_id ON invoices (id)"))
+    conn.execute(
+        text(
+            f"INSERT INTO invoices ({INVOICE_COLUMNS}) "
+            f"SELECT {INVOICE_COLUMNS} FROM invoices_legacy"
+        )
+    )
+    conn.execute(text("DROP TABLE invoices_legacy"))
+
+
+def _invoice_dimensions(conn: Connection) -> None:
+    if "cliente" not in _columns(conn, "invoices"):
+        return
+    for column in ("client_id", "vendor_id"):
+        if column not in _columns(conn, "invoices"):
+            conn.execute(text(f"ALTER TABLE invoices ADD COLUMN {column} INTEGER"))
+
+    # O WHERE evita a ambiguidade do SQLite entre INSERT ... SELECT e ON CONFLICT.
+    conn.execute(
+        text(
+            "INSERT INTO clients (legal_name, is_active, created_at) "
+            "SELECT DISTINCT cliente, TRUE, CURRENT_TIMESTAMP FROM invoices "
+            "WHERE cliente IS NOT NULL ON CONFLICT (legal_name) DO NOTHING"
+        )
+    )
+    conn.execute(
+        text(
+            "INSERT INTO vendors (name, is_active, created_at) "
+            "SELECT DISTINCT vendedor, TRUE, CURRENT_TIMESTAMP FROM invoices "
+            "WHERE vendedor IS NOT NULL ON CONFLICT (name) DO NOTHING"
+        )
+    )
+    conn.commit()
+
+    # Em lotes por faixa de id, como o backfill da 0002: cada lote é commitado e uma migração
+    # interrompida continua pelas linhas ainda sem client_id.
+    pending = text(
+        "SELECT id FROM invoices WHERE client_id IS NULL AND id > :last ORDER BY id LIMIT :limit"
+    )
+    resolve = text(
+        "UPDATE invoices SET "
+        "client_id = (SELECT id FROM clients WHERE legal_name = invoices.cliente), "
+        "vendor_id = (SELECT id FROM vendors WHERE name = invoices.vendedor) "
+        "WHERE client_id IS NULL AND id > :first AND id <= :last"
+    )
+    last = 0
+    while True:
+        ids = conn.execute(pending, {"last": last, "limit": BACKFILL_BATCH_SIZE}).scalars().all()
+        if not ids:
+            break
+        conn.execute(resolve, {"first": last, "last": ids[-1]})
+        last = ids[-1]
+        conn.commit()
+
+    conn.execute(
+        text(
+            "INSERT INTO client_vendor_map (client_id, vendor_id, assigned_at) "
+            "SELECT DISTINCT client_id, vendor_id, CURRENT_TIMESTAMP FROM invoices "
+            "WHERE client_id IS NOT NULL ON CONFLICT (client_id, vendor_id) DO NOTHING"
+        )
+    )
+
+    if conn.dialect.name == "postgresql":
+        conn.execute(
+            text(
+                "ALTER TABLE invoices "
+                "ALTER COLUMN client_id SET NOT NULL, "
+                "ALTER COLUMN vendor_id SET NOT NULL, "
+                "ADD CONSTRAINT invoices_client_id_fkey "
+                "FOREIGN KEY (client_id) REFERENCES clients (id), "
+                "ADD CONSTRAINT invoices_vendor_id_fkey "
+                "FOREIGN KEY (vendor_id) REFERENCES vendors (id), "
+                "DROP COLUMN cliente, "
+                "DROP COLUMN vendedor"
+            )
+        )
+    else:
+        _rebuild_sqlite_invoices(conn)
+
+    # overdue_invoices é derivada: recriada vazia, é repopulada no próximo refresh.
+    conn.execute(text("DROP TABLE IF EXISTS overdue_invoices"))
+    conn.execute(
+        text(
+            "CREATE TABLE overdue_invoices ("
+            "invoice_id INTEGER NOT NULL, "
+            "client_id INTEGER NOT NULL, "
+            "data_vencimento DATE NOT NULL, "
+            "descricao VARCHAR(255) NOT NULL, "
+            "valor_original NUMERIC(12, 2) NOT NULL, "
+            "vendor_id INTEGER NOT NULL, "
+            "origem VARCHAR(50) NOT NULL, "
+            "PRIMARY KEY (invoice_id), "
+            "FOREIGN KEY (client_id) REFERENCES clients (id), "
+            "FOREIGN KEY (vendor_id) REFERENCES vendors (id))"
+        )
+    )
+    for column in ("client_id", "data_vencimento", "vendor_id"):
+        conn.execute(
+            text(f"CREATE INDEX ix_overdue_invoices_{column} ON overdue_invoices ({column})")
+        )
+    conn.execute(
+        text("DELETE FROM report_materializations WHERE name = :name"),
+        {"name": "overdue_invoices"},
+    )
+
+
+def _report_snapshot_delta(conn: Connection) -> None:
+    columns = _columns(conn, "report_snapshots")
+    if "mode" not in columns:
+        conn.execute(
+            text("ALTER TABLE report_snapshots ADD COLUMN mode VARCHAR(10) NOT NULL DEFAULT 'full'")
+        )
+    if "base_snapshot_id" not in columns:
+        conn.execute(
+            text(
+                "ALTER TABLE report_snapshots "
+                "ADD COLUMN base_snapshot_id INTEGER REFERENCES report_snapshots (id)"
+            )
+        )
+
+
+def _import_batch_checksum_index(conn: Connection) -> None:
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_import_batches_checksum "
+            "ON import_batches (source_system, file_checksum)"
+        )
+    )
+
+
+def _import_batch_updated_at(conn: Connection) -> None:
+    if "updated_at" not in _columns(conn, "import_batches"):
+        conn.execute(text("ALTER TABLE import_batches ADD COLUMN updated_at TIMESTAMP"))
+
+
+MIGRATIONS: list[tuple[str, Callable[[Connection], None]]] = [
+    ("0001_send_history_keyset_index", _send_history_keyset_index),
+    ("0002_invoice_dedup_fingerprint", _invoice_dedup_fingerprint),
+    ("0003_import_batch_file_duplicates", _import_batch_file_duplicates),
+    ("0004_invoice_dimensions", _invoice_dimensions),
+    ("0005_report_snapshot_delta", _report_snapshot_delta),
+    ("0006_import_batch_checksum_index", _import_batch_checksum_index),
+    ("0007_import_batch_updated_at", _import_batch_updated_at),
+]
+
+
+def upgrade(bind: Engine = engine) -> list[str]:
+    Base.metadata.create_all(bind=bind)
+    applied = []
+    # Cada migração roda na sua própria transação, registrada junto com a versão; migrações
+    # com backfill podem commitar em lotes antes disso.
+    with bind.connect() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "version VARCHAR(100) PRIMARY KEY, "
+                "applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+            )
+        )
+        conn.commit()
+        done = set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+        for version, migration in MIGRATIONS:
+            if version in done:
+                continue
+            migration(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version) VALUES (:version)"),
+                {"version": version},
+            )
+            conn.commit()
+            applied.append(version)
+    partitions.maintain(bind)
+    return applied
+
+
+if __name__ == "__main__":
+    from app.core.database import SessionLocal
+    from app.services.import_service import sweep_stale_imports
+
+    for version in upgrade():
+        print(f"Migração aplicada: {version}")
+    # Roda aqui, uma vez por deploy, e não na subida de cada worker da API.
+    with SessionLocal() as db:
+        failed, removed = sweep_stale_imports(db)
+    print(f"Importações paradas marcadas como ERRO: {failed}; arquivos removidos: {removed}")
@@ -0,0 +1,205 @@
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import get_settings
+from app.core.database import engine
+
+settings = get_settings()
+
+PARTITION_PREFIX = "invoices_p"
+ARCHIVE_PREFIX = "invoices_archive_p"
+DEFAULT_PARTITION = "invoices_default"
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    return bool(
+        conn.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass('invoices')"
+            )
+        ).scalar()
+    )
+
+
+_partitioned: dict[Engine, bool] = {}
+
+
+def invoices_partitioned(bind: Engine) -> bool:
+    # Vem do catálogo, não de INVOICE_PARTITIONING: desligar a variável depois da conversão
+    # não desfaz a tabela particionada. Lido uma vez por processo; só maintain() muda isso.
+    if bind not in _partitioned:
+        partitioned = False
+        if bind.dialect.name == "postgresql":
+            with bind.connect() as conn:
+                partitioned = is_partitioned(conn)
+        _partitioned[bind] = partitioned
+    return _partitioned[bind]
+
+
+def _partitions(conn: Connection) -> set[str]:
+    return set(
+        conn.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = to_regclass('invoices')"
+            )
+        ).scalars()
+    )
+
+
+def _create_partition(conn: Connection, month: date) -> str:
+    name = _partition_name(month)
+    bounds = {"start": month, "end": _add_months(month, 1)}
+    # Linhas que caíram na partição default antes desta existir são movidas para ela.
+    conn.execute(
+        text(f"CREATE TABLE {name} (LIKE invoices INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    )
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE data_vencimento >= :start AND data_vencimento < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    conn.execute(
+        text(
+            f"ALTER TABLE invoices ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+        )
+    )
+    return name
+
+
+def partition_invoices(conn: Connection, today: date) -> None:
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence('invoices', 'id')")).scalar()
+    first_due = conn.execute(text("SELECT min(data_vencimento) FROM invoices")).scalar()
+
+    conn.execute(text("ALTER TABLE invoices RENAME TO invoices_legacy"))
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    conn.execute(
+        text(
+            "CREATE TABLE invoices "
+            "(LIKE invoices_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY RANGE (data_vencimento)"
+        )
+    )
+    conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF invoices DEFAULT"))
+    month = _month_start(min(first_due or today, today))
+    while month <= _month_start(today):
+        _create_partition(conn, month)
+        month = _add_months(month, 1)
+
+    conn.execute(text("INSERT INTO invoices SELECT * FROM invoices_legacy"))
+    conn.execute(text("DROP TABLE invoices_legacy"))
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY invoices.id"))
+
+    # Chaves únicas de tabelas particionadas precisam incluir a coluna de partição.
+    conn.execute(text("ALTER TABLE invoices ADD PRIMARY KEY (id, data_vencimento)"))
+    conn.execute(
+        text(
+            "CREATE UNIQUE INDEX uq_invoice_fingerprint "
+            "ON invoices (dedup_fingerprint, data_vencimento)"
+        )
+    )
+    conn.execute(text("CREATE INDEX ix_invoices_id ON invoices (id)"))
+    conn.execute(text("CREATE INDEX ix_invoices_data_vencimento ON invoices (data_vencimento)"))
+    # LIKE não copia chaves estrangeiras.
+    conn.execute(
+        text(
+            "ALTER TABLE invoices "
+            "ADD CONSTRAINT invoices_client_id_fkey "
+            "FOREIGN KEY (client_id) REFERENCES clients (id), "
+            "ADD CONSTRAINT invoices_vendor_id_fkey "
+            "FOREIGN KEY (vendor_id) REFERENCES vendors (id)"
+        )
+    )
+
+
+def ensure_partitions(conn: Connection, today: date, months_ahead: int) -> list[str]:
+    existing = _partitions(conn)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = _add_months(_month_start(today), offset)
+        if _partition_name(month) not in existing:
+            created.append(_create_partition(conn, month))
+    return created
+
+
+def _retention_cutoff(today: date, retention_months: int) -> date:
+    return _add_months(_month_start(today), -retention_months)
+
+
+def retention_cutoff(bind: Engine, today: date | None = None) -> date | None:
+    # Vencimentos anteriores a esta data ficam em partições arquivadas (ou vão para elas na
+    # próxima manutenção), fora do alcance da deduplicação.
+    retention_months = settings.invoice_partition_retention_months
+    if not retention_months or not invoices_partitioned(bind):
+        return None
+    return _retention_cutoff(today or date.today(), retention_months)
+
+
+def archive_partitions(conn: Connection, today: date, retention_months: int) -> list[str]:
+    cutoff = _retention_cutoff(today, retention_months)
+    archived = []
+    for name in sorted(_partitions(conn)):
+        if not name.startswith(PARTITION_PREFIX):
+            continue
+        month = date(int(name[-6:-2]), int(name[-2:]), 1)
+        if _add_months(month, 1) > cutoff:
+            continue
+        conn.execute(text(f"ALTER TABLE invoices DETACH PARTITION {name}"))
+        conn.execute(text(f"ALTER TABLE {name} RENAME TO {ARCHIVE_PREFIX}{month:%Y%m}"))
+        conn.execute(
+            text(
+                "DELETE FROM overdue_invoices "
+                "WHERE data_vencimento >= :start AND data_vencimento < :end"
+            ),
+            {"start": month, "end": _add_months(month, 1)},
+        )
+        archived.append(name)
+    return archived
+
+
+def maintain(bind: Engine = engine, today: date | None = None) -> list[str]:
+    if bind.dialect.name != "postgresql":
+        return []
+    today = today or date.today()
+    actions = []
+    with bind.begin() as conn:
+        if not is_partitioned(conn):
+            if not settings.invoice_partitioning:
+                return []
+            partition_invoices(conn, today)
+            _partitioned.pop(bind, None)
+            actions.append("invoices particionada por data_vencimento")
+        for name in ensure_partitions(conn, today, settings.invoice_partition_months_ahead):
+            actions.append(f"partição criada: {name}")
+        if settings.invoice_partition_retention_months:
+            for name in archive_partitions(
+                conn, today, settings.invoice_partition_retention_months
+            ):
+                actions.append(f"partição arquivada: {name}")
+    return actions
+
+
+if __name__ == "__main__":
+    for action in maintain():
+        print(action)
@@ -0,0 +1,123 @@
+import threading
+import time
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.database import (
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    SessionLocal,
+    async_engine,
+    async_read_engine,
+    engine,
+    read_engine,
+)
+
+settings = get_settings()
+
+# Sem WAL pendente de replay a réplica está em dia, mesmo que o primário esteja ocioso.
+LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class ReplicaRouter:
+    def __init__(self, max_lag_seconds: float, check_interval_seconds: float) -> None:
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._lock = threading.Lock()
+        self._checked_at: dict[str, float] = {}
+        self._healthy: dict[str, bool] = {}
+        self._lag: dict[str, float | None] = {}
+        self._replica_reads = 0
+        self._primary_reads = 0
+
+    def _due(self, kind: str) -> bool:
+        checked_at = self._checked_at.get(kind)
+        return checked_at is None or time.monotonic() - checked_at >= self.check_interval_seconds
+
+    def _record(self, kind: str, lag: float | None) -> None:
+        with self._lock:
+            self._checked_at[kind] = time.monotonic()
+            self._lag[kind] = lag
+            self._healthy[kind] = lag is not None and lag <= self.max_lag_seconds
+
+    def _route(self, kind: str) -> bool:
+        with self._lock:
+            healthy = self._healthy.get(kind, False)
+            if healthy:
+                self._replica_reads += 1
+            else:
+                self._primary_reads += 1
+        return healthy
+
+    def use_replica(self) -> bool:
+        if read_engine is engine:
+            return False
+        if self._due("sync"):
+            try:
+                with read_engine.connect() as conn:
+                    lag = 0.0
+                    if conn.dialect.name == "postgresql":
+                        lag = float(conn.execute(LAG_QUERY).scalar() or 0)
+            except Exception:
+                lag = None
+            self._record("sync", lag)
+        return self._route("sync")
+
+    async def use_replica_async(self) -> bool:
+        if async_read_engine is async_engine:
+            return False
+        if self._due("async"):
+            try:
+                async with async_read_engine.connect() as conn:
+                    lag = 0.0
+                    if conn.dialect.name == "postgresql":
+                        lag = float((await conn.execute(LAG_QUERY)).scalar() or 0)
+            except Exception:
+                lag = None
+            self._record("async", lag)
+        return self._route("async")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "configured": read_engine is not engine,
+                "max_lag_seconds": self.max_lag_seconds,
+                "lag_seconds": dict(self._lag),
+                "healthy": dict(self._healthy),
+                "replica_reads": self._replica_reads,
+                "primary_reads": self._primary_reads,
+            }
+
+
+replica_router = ReplicaRouter(
+    settings.replica_max_lag_seconds, settings.replica_check_interval_seconds
+)
+
+
+def is_replica_session(db) -> bool:
+    return read_engine is not engine and db.bind in (read_engine, async_read_engine)
+
+
+def read_session_factory():
+    return ReadSessionLocal if replica_router.use_replica() else SessionLocal
+
+
+def get_read_db():
+    db = read_session_factory()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    use_replica = await replica_router.use_replica_async()
+    async with (AsyncReadSessionLocal if use_replica else AsyncSessionLocal)() as db:
+        yield db
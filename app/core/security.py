@@ -1,21 +1,90 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 
 import jwt
 from passlib.context import CryptContext
 
 from app.core.config import get_settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 settings = get_settings()
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds
+)
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+class _PasswordHasher:
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.completed = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._durations: deque[float] = deque(maxlen=1000)
+        self._lock = threading.Lock()
+
+    def run(self, function: Callable[..., T], *args) -> T:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy("Muitas autenticações simultâneas. Tente novamente.")
+        started = time.perf_counter()
+        try:
+            return self._executor.submit(function, *args).result()
+        finally:
+            self._slots.release()
+            with self._lock:
+                self.completed += 1
+                self._durations.append(time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        with self._lock:
+            durations = sorted(self._durations)
+            completed, rejected = self.completed, self.rejected
+
+        def percentile(fraction: float) -> float:
+            if not durations:
+                return 0.0
+            index = min(len(durations) - 1, int(len(durations) * fraction))
+            return round(durations[index] * 1000, 2)
+
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "completed": completed,
+            "rejected": rejected,
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+        }
+
+
+password_hasher = _PasswordHasher(
+    settings.password_hash_workers, settings.password_hash_queue_size
+)
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.run(pwd_context.hash, password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.run(pwd_context.verify, plain_password, hashed_password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return password_hasher.run(pwd_context.verify_and_update, plain_password, hashed_password)
 
 
 def create_access_token(subject: str, role: str) -> str:
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models import User
+
+settings = get_settings()
+
+
+class CachedUser(NamedTuple):
+    id: int
+    username: str
+    role: str
+    is_2fa_enabled: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            is_2fa_enabled=bool(user.is_2fa_enabled),
+        )
+
+
+class UserCache:
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[int, tuple[float, CachedUser]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> CachedUser | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def set(self, user: CachedUser) -> CachedUser:
+        if self.max_size <= 0:
+            return user
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return user
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+user_cache = UserCache(settings.user_cache_max_size, settings.user_cache_ttl_seconds)
+
+
+@event.listens_for(Session, "after_flush")
+def _stage_changed_users(session: Session, flush_context) -> None:
+    changed = session.info.setdefault("user_cache", set())
+    changed.update(
+        obj.id for obj in (*session.dirty, *session.deleted) if isinstance(obj, User)
+    )
+
+
+# Invalidar só depois do commit: antes disso outra requisição ainda lê a linha antiga do banco
+# e a devolveria ao cache.
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for user_id in session.info.pop("user_cache", ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop("user_cache", None)
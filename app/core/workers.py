@@ -0,0 +1,35 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core.config import get_settings
+from app.core.database import engine
+
+settings = get_settings()
+
+POOL_SIZES = {"imports": settings.import_workers, "parsing": settings.parse_workers}
+
+_process_pools: dict[str, ProcessPoolExecutor] = {}
+
+
+def _init_worker() -> None:
+    # Conexões herdadas do processo pai via fork não podem ser reutilizadas.
+    engine.dispose(close=False)
+
+
+def get_process_pool(name: str = "imports") -> ProcessPoolExecutor:
+    if name not in _process_pools:
+        _process_pools[name] = ProcessPoolExecutor(
+            max_workers=POOL_SIZES[name], initializer=_init_worker
+        )
+    return _process_pools[name]
+
+
+def reset_process_pool(name: str = "imports") -> None:
+    pool = _process_pools.pop(name, None)
+    if pool:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_process_pools() -> None:
+    for pool in _process_pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _process_pools.clear()
@@ -1,9 +1,15 @@
-from fastapi import FastAPI
+import asyncio
+import time
 
-from app.core.database import Base, engine
-from app.routers import auth, history, invoices, reports, users
+from fastapi import FastAPI, Request, Response
 
-Base.metadata.create_all(bind=engine)
+from app.core import metrics
+from app.core.config import get_settings
+from app.core.workers import shutdown_process_pools
+from app.routers import auth, deliveries, diagnostics, history, invoices, reports, users
+from app.services.delivery_service import DeliveryDispatcher
+
+settings = get_settings()
 
 app = FastAPI(title="CobrancaSystem API", version="1.0.0")
 
@@ -12,8 +18,50 @@ app.include_router(users.router)
 app.include_router(invoices.router)
 app.include_router(reports.router)
 app.include_router(history.router)
+app.include_router(deliveries.router)
+app.include_router(diagnostics.router)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    queries = metrics.start_query_count()
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    metrics.observe_request(
+        request.method,
+        route.path if route else "unmatched",
+        response.status_code,
+        time.perf_counter() - started,
+        queries[0],
+    )
+    return response
+
+
+@app.on_event("startup")
+async def start_delivery_dispatcher():
+    if settings.delivery_worker_enabled:
+        app.state.delivery_task = asyncio.create_task(DeliveryDispatcher().run_forever())
+
+
+@app.on_event("shutdown")
+async def stop_delivery_dispatcher():
+    task = getattr(app.state, "delivery_task", None)
+    if task:
+        task.cancel()
+
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    shutdown_process_pools()
 
 
 @app.get("/health", tags=["Health"])
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def metrics_endpoint():
+    content, content_type = metrics.render()
+    return Response(content=content, media_type=content_type)
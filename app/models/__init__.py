@@ -1,3 +1,29 @@
-from app.models.entities import Invoice, ReportSnapshot, SendHistory, User
+from app.models.entities import (
+    Client,
+    ClientVendor,
+    DeliveryAttempt,
+    DeliveryJob,
+    ImportBatch,
+    Invoice,
+    OverdueInvoice,
+    ReportMaterialization,
+    ReportSnapshot,
+    SendHistory,
+    User,
+    Vendor,
+)
 
-__all__ = ["User", "Invoice", "ReportSnapshot", "SendHistory"]
+__all__ = [
+    "User",
+    "Client",
+    "Vendor",
+    "ClientVendor",
+    "Invoice",
+    "OverdueInvoice",
+    "ReportMaterialization",
+    "ImportBatch",
+    "ReportSnapshot",
+    "SendHistory",
+    "DeliveryJob",
+    "DeliveryAttempt",
+]
@@ -8,7 +8,10 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
+    JSON,
     Integer,
+    LargeBinary,
     Numeric,
     String,
     UniqueConstraint,
@@ -18,6 +21,8 @@ from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 class User(Base):
     __tablename__ = "users"
@@ -32,29 +37,112 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class Vendor(Base):
+    __tablename__ = "vendors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(150), unique=True, nullable=False)
+    email = Column(String(150), nullable=True)
+    phone = Column(String(50), nullable=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Client(Base):
+    __tablename__ = "clients"
+
+    id = Column(Integer, primary_key=True, index=True)
+    legal_name = Column(String(200), unique=True, nullable=False)
+    trade_name = Column(String(200), nullable=True)
+    document = Column(String(30), nullable=True)
+    email = Column(String(150), nullable=True)
+    phone = Column(String(50), nullable=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ClientVendor(Base):
+    __tablename__ = "client_vendor_map"
+    __table_args__ = (UniqueConstraint("client_id", "vendor_id", name="uq_client_vendor"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="RESTRICT"), nullable=False)
+    vendor_id = Column(Integer, ForeignKey("vendors.id", ondelete="RESTRICT"), nullable=False)
+    assigned_at = Column(DateTime, default=datetime.utcnow)
+    assigned_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+
 class Invoice(Base):
     __tablename__ = "invoices"
     __table_args__ = (
-        UniqueConstraint(
-            "cliente",
-            "data_vencimento",
-            "valor_original",
-            "descricao",
-            "origem",
-            name="uq_invoice_dedup",
-        ),
+        Index("uq_invoice_fingerprint", "dedup_fingerprint", unique=True),
         CheckConstraint("valor_original > 0", name="ck_invoice_value_positive"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
-    cliente = Column(String(150), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
     data_vencimento = Column(Date, nullable=False, index=True)
     descricao = Column(String(255), nullable=False)
     valor_original = Column(Numeric(12, 2), nullable=False)
-    vendedor = Column(String(150), nullable=False)
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=False)
     origem = Column(String(50), nullable=False)
+    dedup_fingerprint = Column(LargeBinary(16))
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    client = relationship("Client")
+    vendor = relationship("Vendor")
+
+    @property
+    def cliente(self) -> str:
+        return self.client.legal_name
+
+    @property
+    def vendedor(self) -> str:
+        return self.vendor.name
+
+
+class OverdueInvoice(Base):
+    __tablename__ = "overdue_invoices"
+
+    invoice_id = Column(Integer, primary_key=True)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
+    data_vencimento = Column(Date, nullable=False, index=True)
+    descricao = Column(String(255), nullable=False)
+    valor_original = Column(Numeric(12, 2), nullable=False)
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=False, index=True)
+    origem = Column(String(50), nullable=False)
+
+
+class ReportMaterialization(Base):
+    __tablename__ = "report_materializations"
+
+    name = Column(String(50), primary_key=True)
+    as_of = Column(Date, nullable=False)
+    refreshed_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ImportBatch(Base):
+    __tablename__ = "import_batches"
+    __table_args__ = (Index("ix_import_batches_checksum", "source_system", "file_checksum"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_system = Column(String(50), nullable=False)
+    source_reference = Column(String(100), nullable=True)
+    file_name = Column(String(255), nullable=True)
+    file_checksum = Column(String(64), nullable=True)
+    imported_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    imported_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    status = Column(String(20), nullable=False, default="PENDENTE")
+    total_rows = Column(Integer, nullable=False, default=0)
+    inserted_rows = Column(Integer, nullable=False, default=0)
+    skipped_rows = Column(Integer, nullable=False, default=0)
+    skipped_invalid = Column(Integer, nullable=False, default=0)
+    skipped_duplicates = Column(Integer, nullable=False, default=0)
+    skipped_file_duplicates = Column(Integer, nullable=False, default=0)
+    error = Column(String(500), nullable=True)
+
 
 class ReportSnapshot(Base):
     __tablename__ = "report_snapshots"
@@ -64,14 +152,17 @@ class ReportSnapshot(Base):
     recipient_type = Column(String(50), nullable=False)
     method = Column(String(20), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
-    filters_json = Column(JSONB, nullable=True)
-    data_json = Column(JSONB, nullable=False)
+    filters_json = Column(JSONType, nullable=True)
+    data_json = Column(JSONType, nullable=False)
+    mode = Column(String(10), nullable=False, default="full", server_default="full")
+    base_snapshot_id = Column(Integer, ForeignKey("report_snapshots.id"), nullable=True)
 
     histories = relationship("SendHistory", back_populates="snapshot")
 
 
 class SendHistory(Base):
     __tablename__ = "send_history"
+    __table_args__ = (Index("ix_send_history_sent_at_id", "sent_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     recipient_type = Column(Enum("DIRETORIA", "VENDEDOR", name="recipient_type"), nullable=False)
@@ -82,3 +173,39 @@ class SendHistory(Base):
     snapshot_id = Column(Integer, ForeignKey("report_snapshots.id"), nullable=False)
 
     snapshot = relationship("ReportSnapshot", back_populates="histories")
+
+
+class DeliveryJob(Base):
+    __tablename__ = "delivery_jobs"
+    __table_args__ = (Index("ix_delivery_jobs_status_next", "status", "next_attempt_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    snapshot_id = Column(Integer, ForeignKey("report_snapshots.id"), nullable=False)
+    recipient_type = Column(String(20), nullable=False)
+    recipient_value = Column(String(150), nullable=True)
+    destination = Column(String(50), nullable=False)
+    provider = Column(String(30), nullable=False)
+    status = Column(String(20), nullable=False, default="PENDENTE")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String(500), nullable=True)
+    provider_message_id = Column(String(100), nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    snapshot = relationship("ReportSnapshot")
+    attempt_log = relationship("DeliveryAttempt", order_by="DeliveryAttempt.id")
+
+
+class DeliveryAttempt(Base):
+    __tablename__ = "delivery_attempts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("delivery_jobs.id"), nullable=False, index=True)
+    attempt = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False)
+    error = Column(String(500), nullable=True)
+    provider_message_id = Column(String(100), nullable=True)
+    duration_ms = Column(Integer, nullable=False, default=0)
+    attempted_at = Column(DateTime, default=datetime.utcnow)
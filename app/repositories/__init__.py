@@ -1,13 +1,21 @@
+from app.repositories.import_repository import create as create_import_batch
+from app.repositories.import_repository import get as get_import_batch
+from app.repositories.invoice_repository import bulk_create as bulk_create_invoices
 from app.repositories.invoice_repository import create as create_invoice
 from app.repositories.invoice_repository import find_duplicate, list_overdue
+from app.repositories.overdue_repository import refresh as refresh_overdue
 from app.repositories.report_repository import create_history, create_snapshot, list_history
 from app.repositories.user_repository import create as create_user
 from app.repositories.user_repository import get_by_username
 
 __all__ = [
     "create_invoice",
+    "bulk_create_invoices",
     "find_duplicate",
     "list_overdue",
+    "refresh_overdue",
+    "create_import_batch",
+    "get_import_batch",
     "create_snapshot",
     "create_history",
     "list_history",
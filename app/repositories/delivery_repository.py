@@ -0,0 +1,90 @@
+from datetime import datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import DeliveryAttempt, DeliveryJob, SendHistory
+
+CLAIMABLE = ("PENDENTE", "ENVIANDO")
+
+
+def create_jobs(db: Session, jobs: list[DeliveryJob]) -> list[DeliveryJob]:
+    db.add_all(jobs)
+    db.commit()
+    return jobs
+
+
+def get(db: Session, job_id: int) -> DeliveryJob | None:
+    return db.execute(
+        select(DeliveryJob)
+        .options(selectinload(DeliveryJob.attempt_log))
+        .where(DeliveryJob.id == job_id)
+    ).scalar()
+
+
+def list_jobs(db: Session, limit: int, status: str | None = None) -> list[DeliveryJob]:
+    query = select(DeliveryJob)
+    if status:
+        query = query.where(DeliveryJob.status == status)
+    return list(db.execute(query.order_by(DeliveryJob.id.desc()).limit(limit)).scalars())
+
+
+async def claim_due_async(
+    db: AsyncSession, provider: str, now: datetime, lease_until: datetime, limit: int
+) -> list[DeliveryJob]:
+    # ENVIANDO com prazo vencido é de um worker que caiu no meio do envio.
+    due = [
+        DeliveryJob.provider == provider,
+        DeliveryJob.status.in_(CLAIMABLE),
+        DeliveryJob.next_attempt_at <= now,
+    ]
+    ids = (
+        await db.execute(
+            select(DeliveryJob.id).where(*due).order_by(DeliveryJob.next_attempt_at).limit(limit)
+        )
+    ).scalars().all()
+    if not ids:
+        return []
+    claimed = (
+        await db.execute(
+            update(DeliveryJob)
+            .where(DeliveryJob.id.in_(ids), *due)
+            .values(
+                status="ENVIANDO",
+                attempts=DeliveryJob.attempts + 1,
+                next_attempt_at=lease_until,
+            )
+            .returning(DeliveryJob.id)
+            .execution_options(synchronize_session=False)
+        )
+    ).scalars().all()
+    await db.commit()
+    if not claimed:
+        return []
+    return list(
+        (
+            await db.execute(
+                select(DeliveryJob)
+                .options(selectinload(DeliveryJob.snapshot))
+                .where(DeliveryJob.id.in_(claimed))
+                .order_by(DeliveryJob.id)
+            )
+        ).scalars()
+    )
+
+
+async def record_attempts_async(
+    db: AsyncSession, results: list[tuple[int, dict, DeliveryAttempt, SendHistory | None]]
+) -> None:
+    for job_id, values, attempt, history in results:
+        await db.execute(
+            update(DeliveryJob)
+            .where(DeliveryJob.id == job_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.add(attempt)
+        if history is not None:
+            db.add(history)
+    await db.commit()
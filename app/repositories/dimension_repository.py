@@ -0,0 +1,61 @@
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.database import dialect_insert
+from app.core.dimension_cache import (
+    DimensionCache,
+    client_cache,
+    client_vendor_cache,
+    stage,
+    vendor_cache,
+)
+from app.models import Client, ClientVendor, Vendor
+
+
+def _resolve(
+    db: Session, cache: DimensionCache, model, name_column, names: Iterable[str]
+) -> dict[str, int]:
+    ids, missing = cache.get_many(set(names))
+    if missing:
+        db.execute(
+            dialect_insert(db, model.__table__).on_conflict_do_nothing(
+                index_elements=[name_column.key]
+            ),
+            [{name_column.key: name} for name in missing],
+        )
+        resolved = dict(
+            db.execute(select(name_column, model.id).where(name_column.in_(missing))).all()
+        )
+        stage(db, cache, resolved)
+        ids.update(resolved)
+    return ids
+
+
+def resolve_clients(db: Session, names: Iterable[str]) -> dict[str, int]:
+    return _resolve(db, client_cache, Client, Client.legal_name, names)
+
+
+def resolve_vendors(db: Session, names: Iterable[str]) -> dict[str, int]:
+    return _resolve(db, vendor_cache, Vendor, Vendor.name, names)
+
+
+def link_client_vendors(db: Session, pairs: Iterable[tuple[int, int]]) -> None:
+    _, missing = client_vendor_cache.get_many(set(pairs))
+    if not missing:
+        return
+    db.execute(
+        dialect_insert(db, ClientVendor.__table__).on_conflict_do_nothing(
+            index_elements=["client_id", "vendor_id"]
+        ),
+        [{"client_id": client, "vendor_id": vendor} for client, vendor in missing],
+    )
+    stage(db, client_vendor_cache, {pair: pair[1] for pair in missing})
+
+
+def vendor_phones(db: Session, names: Iterable[str] | None = None) -> dict[str, str]:
+    query = select(Vendor.name, Vendor.phone).where(Vendor.is_active, Vendor.phone.is_not(None))
+    if names is not None:
+        query = query.where(Vendor.name.in_(set(names)))
+    return dict(db.execute(query.order_by(Vendor.name)).all())
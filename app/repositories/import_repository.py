@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import ImportBatch
+
+
+def create(db: Session, batch: ImportBatch) -> ImportBatch:
+    db.add(batch)
+    db.commit()
+    db.refresh(batch)
+    return batch
+
+
+def get(db: Session, batch_id: int) -> ImportBatch | None:
+    return db.get(ImportBatch, batch_id)
+
+
+def find_by_checksum(
+    db: Session, source: str, checksum: str, statuses: tuple[str, ...]
+) -> ImportBatch | None:
+    return db.execute(
+        select(ImportBatch)
+        .where(
+            ImportBatch.source_system == source,
+            ImportBatch.file_checksum == checksum,
+            ImportBatch.status.in_(statuses),
+        )
+        .order_by(ImportBatch.id.desc())
+        .limit(1)
+    ).scalar()
+
+
+def update(db: Session, batch: ImportBatch, **values) -> ImportBatch:
+    for key, value in values.items():
+        setattr(batch, key, value)
+    db.commit()
+    return batch
+
+
+def touch(db: Session, batch_ids: list[int], status: str) -> int:
+    touched = (
+        db.query(ImportBatch)
+        .filter(ImportBatch.id.in_(batch_ids), ImportBatch.status == status)
+        .update({"updated_at": datetime.utcnow()}, synchronize_session=False)
+    )
+    db.commit()
+    return touched
+
+
+def fail_stale(db: Session, statuses: tuple[str, ...], cutoff: datetime, error: str) -> int:
+    failed = (
+        db.query(ImportBatch)
+        .filter(
+            ImportBatch.status.in_(statuses),
+            func.coalesce(ImportBatch.updated_at, ImportBatch.imported_at) < cutoff,
+        )
+        .update(
+            {"status": "ERRO", "error": error, "finished_at": datetime.utcnow()},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return failed
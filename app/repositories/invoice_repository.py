@@ -1,28 +1,22 @@
 from datetime import date
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
 
+from app.core.database import dialect_insert
+from app.core.dimension_cache import invoice_fingerprint_cache, stage
+from app.core.partitions import invoices_partitioned
 from app.models import Invoice
+from app.repositories import overdue_repository
 
 
-def find_duplicate(
-    db: Session,
-    cliente: str,
-    data_vencimento: date,
-    valor_original,
-    descricao: str,
-    origem: str,
-) -> Invoice | None:
-    return (
-        db.query(Invoice)
-        .filter(
-            Invoice.cliente == cliente,
-            Invoice.data_vencimento == data_vencimento,
-            Invoice.valor_original == valor_original,
-            Invoice.descricao == descricao,
-            Invoice.origem == origem,
-        )
-        .first()
-    )
+def _conflict_columns(db: Session) -> list[str]:
+    if invoices_partitioned(db.get_bind()):
+        return ["dedup_fingerprint", "data_vencimento"]
+    return ["dedup_fingerprint"]
+
+
+def find_duplicate(db: Session, dedup_fingerprint: bytes) -> Invoice | None:
+    return db.query(Invoice).filter(Invoice.dedup_fingerprint == dedup_fingerprint).first()
 
 
 def create(db: Session, invoice: Invoice) -> Invoice:
@@ -32,5 +26,43 @@ def create(db: Session, invoice: Invoice) -> Invoice:
     return invoice
 
 
+def ids_by_fingerprint(db: Session, fingerprints: list[bytes]) -> dict[bytes, int]:
+    if not fingerprints:
+        return {}
+    rows = db.execute(
+        select(Invoice.dedup_fingerprint, Invoice.id).where(
+            Invoice.dedup_fingerprint.in_(fingerprints)
+        )
+    )
+    return {bytes(fingerprint): invoice_id for fingerprint, invoice_id in rows}
+
+
+def bulk_create(db: Session, rows: list[dict]) -> int:
+    if not rows:
+        return 0
+    statement = (
+        dialect_insert(db, Invoice.__table__)
+        .on_conflict_do_nothing(index_elements=_conflict_columns(db))
+        .returning(Invoice.dedup_fingerprint, Invoice.id)
+    )
+    inserted = {
+        bytes(fingerprint): invoice_id
+        for fingerprint, invoice_id in db.execute(statement, rows)
+    }
+    overdue_repository.add_invoices(db, list(inserted.values()))
+    if invoice_fingerprint_cache.max_size > 0:
+        conflicting = [
+            row["dedup_fingerprint"] for row in rows if row["dedup_fingerprint"] not in inserted
+        ]
+        stage(db, invoice_fingerprint_cache, {**inserted, **ids_by_fingerprint(db, conflicting)})
+    db.commit()
+    return len(inserted)
+
+
 def list_overdue(db: Session, today: date) -> list[Invoice]:
-    return db.query(Invoice).filter(Invoice.data_vencimento < today).all()
+    return (
+        db.query(Invoice)
+        .options(joinedload(Invoice.client), joinedload(Invoice.vendor))
+        .filter(Invoice.data_vencimento < today)
+        .all()
+    )
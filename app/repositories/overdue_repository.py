@@ -0,0 +1,159 @@
+from datetime import date, datetime, timedelta
+from typing import Iterator
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.database import dialect_insert
+
+from app.models import Client, Invoice, OverdueInvoice, ReportMaterialization, Vendor
+
+MATERIALIZATION_NAME = "overdue_invoices"
+
+COLUMNS = ["cliente", "data_vencimento", "descricao", "valor_original", "vendedor", "origem"]
+MATERIALIZED_COLUMNS = [
+    "client_id",
+    "data_vencimento",
+    "descricao",
+    "valor_original",
+    "vendor_id",
+    "origem",
+]
+
+AGING_BUCKETS = [(30, "0-30"), (60, "31-60"), (90, "61-90")]
+AGING_OVERFLOW = "90+"
+
+
+def _as_of_query():
+    return select(ReportMaterialization.as_of).where(
+        ReportMaterialization.name == MATERIALIZATION_NAME
+    )
+
+
+def _materialize(db: Session, *criteria) -> None:
+    source = select(
+        Invoice.id, *(getattr(Invoice, column) for column in MATERIALIZED_COLUMNS)
+    ).where(*criteria)
+    db.execute(
+        dialect_insert(db, OverdueInvoice)
+        .from_select(["invoice_id", *MATERIALIZED_COLUMNS], source)
+        .on_conflict_do_nothing(index_elements=["invoice_id"])
+    )
+
+
+def add_invoices(db: Session, invoice_ids: list[int], today: date | None = None) -> None:
+    # Compara com hoje e não com as_of: um refresh concorrente pode ler o as_of antigo e
+    # varrer a janela antes deste lote ser commitado. Repetir linhas que o refresh também
+    # materializa é inofensivo (ON CONFLICT DO NOTHING).
+    if invoice_ids:
+        _materialize(
+            db, Invoice.id.in_(invoice_ids), Invoice.data_vencimento < (today or date.today())
+        )
+
+
+def get_as_of(db: Session) -> date | None:
+    return db.execute(_as_of_query()).scalar()
+
+
+def refresh(db: Session, today: date) -> None:
+    as_of = get_as_of(db)
+    if as_of is not None and as_of >= today:
+        return
+    criteria = [Invoice.data_vencimento < today]
+    if as_of is not None:
+        criteria.append(Invoice.data_vencimento >= as_of)
+    _materialize(db, *criteria)
+    db.execute(
+        dialect_insert(db, ReportMaterialization)
+        .values(name=MATERIALIZATION_NAME, as_of=today)
+        .on_conflict_do_update(
+            index_elements=["name"],
+            set_={
+                "as_of": case(
+                    (ReportMaterialization.as_of > today, ReportMaterialization.as_of),
+                    else_=today,
+                ),
+                "refreshed_at": datetime.utcnow(),
+            },
+        )
+    )
+    db.commit()
+
+
+def _criteria(filters: dict) -> list:
+    criteria = []
+    if filters.get("vendedor"):
+        vendor_id = select(Vendor.id).where(Vendor.name == filters["vendedor"])
+        criteria.append(OverdueInvoice.vendor_id == vendor_id.scalar_subquery())
+    if filters.get("cliente"):
+        client_id = select(Client.id).where(Client.legal_name == filters["cliente"])
+        criteria.append(OverdueInvoice.client_id == client_id.scalar_subquery())
+    if filters.get("origem"):
+        criteria.append(OverdueInvoice.origem == filters["origem"])
+    if filters.get("vencimento_de"):
+        criteria.append(OverdueInvoice.data_vencimento >= filters["vencimento_de"])
+    if filters.get("vencimento_ate"):
+        criteria.append(OverdueInvoice.data_vencimento <= filters["vencimento_ate"])
+    return criteria
+
+
+def _rows_query(filters: dict):
+    return (
+        select(
+            OverdueInvoice.invoice_id,
+            Client.legal_name.label("cliente"),
+            OverdueInvoice.data_vencimento,
+            OverdueInvoice.descricao,
+            OverdueInvoice.valor_original,
+            Vendor.name.label("vendedor"),
+            OverdueInvoice.origem,
+        )
+        .join(Client, Client.id == OverdueInvoice.client_id)
+        .join(Vendor, Vendor.id == OverdueInvoice.vendor_id)
+        .where(*_criteria(filters))
+        .order_by(OverdueInvoice.invoice_id)
+    )
+
+
+def list_rows(db: Session, filters: dict | None = None) -> list[tuple]:
+    return db.execute(_rows_query(filters or {})).all()
+
+
+def stream_rows(
+    db: Session, filters: dict | None = None, batch_size: int = 5000
+) -> Iterator[tuple]:
+    query = _rows_query(filters or {}).execution_options(yield_per=batch_size)
+    yield from db.execute(query)
+
+
+def totals_by_vendedor(db: Session, filters: dict | None = None) -> list[tuple]:
+    totals = (
+        select(
+            OverdueInvoice.vendor_id,
+            func.count().label("quantidade"),
+            func.sum(OverdueInvoice.valor_original).label("valor_total"),
+        )
+        .where(*_criteria(filters or {}))
+        .group_by(OverdueInvoice.vendor_id)
+        .subquery()
+    )
+    return db.execute(
+        select(Vendor.name, totals.c.quantidade, totals.c.valor_total)
+        .join(totals, totals.c.vendor_id == Vendor.id)
+        .order_by(Vendor.name)
+    ).all()
+
+
+def aging_buckets(db: Session, today: date, filters: dict | None = None) -> list[tuple]:
+    bucket = case(
+        *(
+            (OverdueInvoice.data_vencimento >= today - timedelta(days=days), label)
+            for days, label in AGING_BUCKETS
+        ),
+        else_=AGING_OVERFLOW,
+    ).label("faixa")
+    return db.execute(
+        select(bucket, func.count(), func.sum(OverdueInvoice.valor_original))
+        .where(*_criteria(filters or {}))
+        .group_by(bucket)
+    ).all()
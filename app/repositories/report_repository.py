@@ -1,3 +1,7 @@
+from datetime import datetime
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models import ReportSnapshot, SendHistory
@@ -10,6 +14,30 @@ def create_snapshot(db: Session, snapshot: ReportSnapshot) -> ReportSnapshot:
     return snapshot
 
 
+def get_snapshot(db: Session, snapshot_id: int) -> ReportSnapshot | None:
+    return db.get(ReportSnapshot, snapshot_id)
+
+
+async def get_snapshot_async(db: AsyncSession, snapshot_id: int) -> ReportSnapshot | None:
+    return await db.get(ReportSnapshot, snapshot_id)
+
+
+def last_sent_snapshot(
+    db: Session, recipient_type: str, recipient_value: str | None, report_type: str
+) -> ReportSnapshot | None:
+    return db.execute(
+        select(ReportSnapshot)
+        .join(SendHistory, SendHistory.snapshot_id == ReportSnapshot.id)
+        .where(
+            SendHistory.recipient_type == recipient_type,
+            SendHistory.recipient_value == recipient_value,
+            SendHistory.report_type == report_type,
+        )
+        .order_by(SendHistory.sent_at.desc(), SendHistory.id.desc())
+        .limit(1)
+    ).scalar()
+
+
 def create_history(db: Session, history: SendHistory) -> SendHistory:
     db.add(history)
     db.commit()
@@ -17,5 +45,31 @@ def create_history(db: Session, history: SendHistory) -> SendHistory:
     return history
 
 
-def list_history(db: Session) -> list[SendHistory]:
-    return db.query(SendHistory).order_by(SendHistory.sent_at.desc()).all()
+def _history_query(
+    limit: int,
+    after: tuple[datetime, int] | None = None,
+    recipient_type: str | None = None,
+    method: str | None = None,
+    sent_from: datetime | None = None,
+    sent_to: datetime | None = None,
+) -> Select:
+    query = select(SendHistory)
+    if after:
+        query = query.where(tuple_(SendHistory.sent_at, SendHistory.id) < tuple_(*after))
+    if recipient_type:
+        query = query.where(SendHistory.recipient_type == recipient_type)
+    if method:
+        query = query.where(SendHistory.method == method)
+    if sent_from:
+        query = query.where(SendHistory.sent_at >= sent_from)
+    if sent_to:
+        query = query.where(SendHistory.sent_at < sent_to)
+    return query.order_by(SendHistory.sent_at.desc(), SendHistory.id.desc()).limit(limit)
+
+
+def list_history(db: Session, limit: int, **filters) -> list[SendHistory]:
+    return list(db.execute(_history_query(limit, **filters)).scalars())
+
+
+async def list_history_async(db: AsyncSession, limit: int, **filters) -> list[SendHistory]:
+    return list((await db.execute(_history_query(limit, **filters))).scalars())
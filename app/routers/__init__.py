@@ -1,3 +1,3 @@
-from app.routers import auth, history, invoices, reports, users
+from app.routers import auth, diagnostics, history, invoices, reports, users
 
-__all__ = ["auth", "users", "invoices", "reports", "history"]
+__all__ = ["auth", "users", "invoices", "reports", "history", "diagnostics"]
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.deps import get_current_user
+from app.core.security import PasswordHasherBusy
 from app.schemas.auth import (
     LoginRequest,
     TokenResponse,
@@ -23,6 +24,12 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
         return TokenResponse(access_token=token)
     except auth_service.AuthError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
+    except PasswordHasherBusy as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": "1"},
+        ) from exc
 
 
 @router.post("/setup-2fa", response_model=TwoFactorSetupResponse)
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.deps import require_role
+from app.schemas.delivery import DeliveryCreate, DeliveryJobDetail, DeliveryJobResponse
+from app.services import delivery_service
+
+router = APIRouter(prefix="/deliveries", tags=["Deliveries"])
+
+
+@router.post("", response_model=list[DeliveryJobResponse], status_code=status.HTTP_202_ACCEPTED)
+def create_deliveries(
+    payload: DeliveryCreate,
+    db: Session = Depends(get_db),
+    user=Depends(require_role("admin", "operadora")),
+):
+    recipients = (
+        [recipient.model_dump() for recipient in payload.recipients]
+        if payload.recipients is not None
+        else None
+    )
+    try:
+        return delivery_service.enqueue_deliveries(
+            db, payload.report_type, payload.mode, recipients, user.id
+        )
+    except delivery_service.DeliveryError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+@router.get("", response_model=list[DeliveryJobResponse])
+def list_deliveries(
+    limit: int = Query(default=50, ge=1, le=500),
+    status_filter: str | None = Query(default=None, alias="status"),
+    db: Session = Depends(get_db),
+    _user=Depends(require_role("admin", "operadora")),
+):
+    return delivery_service.list_jobs(db, limit, status_filter)
+
+
+@router.get("/{job_id}", response_model=DeliveryJobDetail)
+def get_delivery(
+    job_id: int,
+    db: Session = Depends(get_db),
+    _user=Depends(require_role("admin", "operadora")),
+):
+    try:
+        return delivery_service.get_job(db, job_id)
+    except delivery_service.DeliveryJobNotFound as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends
+
+from app.core.database import async_engine, async_read_engine, engine, read_engine
+from app.core.deps import require_role
+from app.core.dimension_cache import (
+    client_cache,
+    client_vendor_cache,
+    invoice_fingerprint_cache,
+    vendor_cache,
+)
+from app.core.pool_metrics import pool_status
+from app.core.replica import replica_router
+from app.core.security import password_hasher
+from app.core.user_cache import user_cache
+
+router = APIRouter(prefix="/diagnostics", tags=["Diagnostics"])
+
+
+@router.get("/user-cache")
+def user_cache_stats(_admin=Depends(require_role("admin"))):
+    return user_cache.stats()
+
+
+@router.get("/dimension-cache")
+def dimension_cache_stats(_admin=Depends(require_role("admin"))):
+    return {
+        "clients": client_cache.stats(),
+        "vendors": vendor_cache.stats(),
+        "client_vendors": client_vendor_cache.stats(),
+        "invoice_fingerprints": invoice_fingerprint_cache.stats(),
+    }
+
+
+@router.get("/password-hasher")
+def password_hasher_stats(_admin=Depends(require_role("admin"))):
+    return password_hasher.stats()
+
+
+@router.get("/db-pool")
+def db_pool_stats(_admin=Depends(require_role("admin"))):
+    pools = {"sync": pool_status(engine), "async": pool_status(async_engine.sync_engine)}
+    if read_engine is not engine:
+        pools["read_sync"] = pool_status(read_engine)
+        pools["read_async"] = pool_status(async_read_engine.sync_engine)
+    return pools
+
+
+@router.get("/replica")
+def replica_stats(_admin=Depends(require_role("admin"))):
+    return replica_router.stats()
@@ -1,17 +1,42 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import datetime
 
-from app.core.database import get_db
-from app.core.deps import require_role
-from app.schemas.report import SendHistoryResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.deps import require_role_async
+from app.core.replica import get_async_read_db
+from app.schemas.report import RecipientType, SendHistoryResponse, SendMethod
 from app.services import report_service
 
 router = APIRouter(prefix="/history", tags=["History"])
+settings = get_settings()
 
 
 @router.get("", response_model=list[SendHistoryResponse])
-def list_history(
-    db: Session = Depends(get_db),
-    _user=Depends(require_role("admin", "operadora")),
+async def list_history(
+    response: Response,
+    limit: int = Query(default=settings.history_page_size, ge=1, le=settings.history_max_page_size),
+    cursor: str | None = None,
+    recipient_type: RecipientType | None = None,
+    method: SendMethod | None = None,
+    sent_from: datetime | None = None,
+    sent_to: datetime | None = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    _user=Depends(require_role_async("admin", "operadora")),
 ):
-    return report_service.list_history(db)
+    try:
+        items, next_cursor = await report_service.list_history_async(
+            db,
+            limit,
+            cursor=cursor,
+            recipient_type=recipient_type,
+            method=method,
+            sent_from=sent_from,
+            sent_to=sent_to,
+        )
+    except report_service.InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
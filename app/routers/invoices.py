@@ -3,46 +3,155 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.deps import require_role
-from app.schemas.invoice import InvoiceUploadSummary
-from app.services import invoice_service
+from app.models import ImportBatch
+from app.schemas.invoice import (
+    ImportJobResponse,
+    InvoiceBatchUploadSummary,
+    InvoiceFileUploadSummary,
+    InvoiceUploadSummary,
+)
+from app.services import import_service
 from app.utils.excel_parsers import ExcelParseError
 
 router = APIRouter(prefix="/invoices", tags=["Invoices"])
 
 
+def _summary(batch: ImportBatch, reused: bool) -> InvoiceUploadSummary:
+    return InvoiceUploadSummary(
+        inserted=batch.inserted_rows,
+        skipped_invalid=batch.skipped_invalid,
+        skipped_duplicates=batch.skipped_duplicates,
+        skipped_file_duplicates=batch.skipped_file_duplicates,
+        import_id=batch.id,
+        reused=reused,
+    )
+
+
+def _upload(
+    db: Session, source: str, file: UploadFile, user_id: int, force: bool
+) -> InvoiceUploadSummary:
+    try:
+        batch, reused = import_service.upload_file(
+            db, source, file.file, file.filename or "", user_id, force
+        )
+    except ExcelParseError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return _summary(batch, reused)
+
+
 @router.post("/upload/itau", response_model=InvoiceUploadSummary)
 def upload_itau(
     file: UploadFile = File(...),
+    force: bool = False,
     db: Session = Depends(get_db),
-    _user=Depends(require_role("admin", "operadora")),
+    user=Depends(require_role("admin", "operadora")),
 ):
-    try:
-        content = file.file.read()
-        inserted, skipped_invalid, skipped_duplicates = invoice_service.upload_itau(db, content)
-        return InvoiceUploadSummary(
-            inserted=inserted,
-            skipped_invalid=skipped_invalid,
-            skipped_duplicates=skipped_duplicates,
-        )
-    except ExcelParseError as exc:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return _upload(db, "ITAU", file, user.id, force)
 
 
 @router.post("/upload/conta-azul", response_model=InvoiceUploadSummary)
 def upload_conta_azul(
     file: UploadFile = File(...),
+    force: bool = False,
     db: Session = Depends(get_db),
-    _user=Depends(require_role("admin", "operadora")),
+    user=Depends(require_role("admin", "operadora")),
 ):
-    try:
-        content = file.file.read()
-        inserted, skipped_invalid, skipped_duplicates = invoice_service.upload_conta_azul(
-            db, content
+    return _upload(db, "CONTA_AZUL", file, user.id, force)
+
+
+@router.post("/upload/batch", response_model=InvoiceBatchUploadSummary)
+def upload_batch(
+    itau_files: list[UploadFile] = File(default=[]),
+    conta_azul_files: list[UploadFile] = File(default=[]),
+    force: bool = False,
+    db: Session = Depends(get_db),
+    user=Depends(require_role("admin", "operadora")),
+):
+    files = [("ITAU", upload.file, upload.filename or "") for upload in itau_files] + [
+        ("CONTA_AZUL", upload.file, upload.filename or "") for upload in conta_azul_files
+    ]
+    if not files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Nenhum arquivo enviado."
         )
-        return InvoiceUploadSummary(
-            inserted=inserted,
-            skipped_invalid=skipped_invalid,
-            skipped_duplicates=skipped_duplicates,
+    results = import_service.upload_batch(db, files, user.id, force)
+    summaries = [
+        InvoiceFileUploadSummary(
+            file_name=filename,
+            source=source,
+            error=batch.error,
+            **_summary(batch, reused).model_dump(),
         )
-    except ExcelParseError as exc:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        for filename, source, batch, reused in results
+    ]
+    total = InvoiceUploadSummary(
+        inserted=sum(summary.inserted for summary in summaries),
+        skipped_invalid=sum(summary.skipped_invalid for summary in summaries),
+        skipped_duplicates=sum(summary.skipped_duplicates for summary in summaries),
+        skipped_file_duplicates=sum(summary.skipped_file_duplicates for summary in summaries),
+    )
+    return InvoiceBatchUploadSummary(files=summaries, total=total)
+
+
+def _job_response(batch: ImportBatch, reused: bool = False) -> ImportJobResponse:
+    summary = None
+    if batch.status == "CONCLUIDO":
+        summary = _summary(batch, reused)
+    return ImportJobResponse(
+        id=batch.id,
+        source_system=batch.source_system,
+        file_name=batch.file_name,
+        status=batch.status,
+        total_rows=batch.total_rows,
+        inserted_rows=batch.inserted_rows,
+        skipped_rows=batch.skipped_rows,
+        imported_at=batch.imported_at,
+        finished_at=batch.finished_at,
+        error=batch.error,
+        summary=summary,
+        reused=reused,
+    )
+
+
+@router.post(
+    "/imports/itau", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED
+)
+def import_itau(
+    file: UploadFile = File(...),
+    force: bool = False,
+    db: Session = Depends(get_db),
+    user=Depends(require_role("admin", "operadora")),
+):
+    batch, reused = import_service.enqueue_import(
+        db, "ITAU", file.file, file.filename or "", user.id, force
+    )
+    return _job_response(batch, reused)
+
+
+@router.post(
+    "/imports/conta-azul",
+    response_model=ImportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def import_conta_azul(
+    file: UploadFile = File(...),
+    force: bool = False,
+    db: Session = Depends(get_db),
+    user=Depends(require_role("admin", "operadora")),
+):
+    batch, reused = import_service.enqueue_import(
+        db, "CONTA_AZUL", file.file, file.filename or "", user.id, force
+    )
+    return _job_response(batch, reused)
+
+
+@router.get("/imports/{job_id}", response_model=ImportJobResponse)
+def get_import(
+    job_id: int,
+    db: Session = Depends(get_db),
+    _user=Depends(require_role("admin", "operadora")),
+):
+    try:
+        return _job_response(import_service.get_import(db, job_id))
+    except import_service.ImportJobNotFound as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
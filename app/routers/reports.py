@@ -1,13 +1,33 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.deps import require_role
-from app.schemas.report import ReportSnapshotCreate, ReportSnapshotResponse
-from app.services import report_service
+from app.core.database import AsyncSessionLocal, SessionLocal, get_db
+from app.core.deps import require_role, require_role_async
+from app.core.replica import (
+    get_async_read_db,
+    get_read_db,
+    is_replica_session,
+    read_session_factory,
+)
+from app.schemas.report import Origem, ReportSnapshotCreate, ReportSnapshotResponse
+from app.services import export_service, report_service
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
+EXPORT_FORMAT = Query(default="csv", pattern="^(csv|ndjson|xlsx)$")
+
+
+def _export_response(chunks, export_format: str, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=export_service.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
+
 
 @router.post("/snapshot", response_model=ReportSnapshotResponse)
 def create_snapshot(
@@ -21,5 +41,88 @@ def create_snapshot(
         recipient_type=payload.recipient_type,
         method=payload.method,
         recipient_value=payload.recipient_value,
+        filters=payload.model_dump(include=set(report_service.FILTER_FIELDS)),
+        mode=payload.mode,
     )
     return snapshot
+
+
+@router.get("/snapshot/{snapshot_id}", response_model=ReportSnapshotResponse)
+async def get_snapshot(
+    snapshot_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    _user=Depends(require_role_async("admin", "operadora")),
+):
+    try:
+        try:
+            return await report_service.get_snapshot_async(db, snapshot_id)
+        except report_service.SnapshotNotFound:
+            # Um snapshot recém-criado pode ainda não ter chegado à réplica.
+            if not is_replica_session(db):
+                raise
+        async with AsyncSessionLocal() as primary:
+            return await report_service.get_snapshot_async(primary, snapshot_id)
+    except report_service.SnapshotNotFound as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+
+@router.get("/snapshot/{snapshot_id}/full", response_model=ReportSnapshotResponse)
+def get_full_snapshot(
+    snapshot_id: int,
+    db: Session = Depends(get_read_db),
+    _user=Depends(require_role("admin", "operadora")),
+):
+    try:
+        try:
+            snapshot, rows = report_service.get_full_snapshot(db, snapshot_id)
+        except report_service.SnapshotNotFound:
+            if not is_replica_session(db):
+                raise
+            with SessionLocal() as primary:
+                snapshot, rows = report_service.get_full_snapshot(primary, snapshot_id)
+    except report_service.SnapshotNotFound as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    response = ReportSnapshotResponse.model_validate(snapshot, from_attributes=True)
+    return response.model_copy(update={"data_json": rows})
+
+
+@router.get("/snapshot/{snapshot_id}/export")
+def export_snapshot(
+    snapshot_id: int,
+    format: str = EXPORT_FORMAT,
+    full: bool = False,
+    db: Session = Depends(get_read_db),
+    _user=Depends(require_role("admin", "operadora")),
+):
+    try:
+        try:
+            chunks = export_service.export_snapshot(db, snapshot_id, format, full)
+        except report_service.SnapshotNotFound:
+            if not is_replica_session(db):
+                raise
+            with SessionLocal() as primary:
+                chunks = export_service.export_snapshot(primary, snapshot_id, format, full)
+    except report_service.SnapshotNotFound as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    return _export_response(chunks, format, f"snapshot-{snapshot_id}")
+
+
+@router.get("/overdue/export")
+def export_overdue(
+    format: str = EXPORT_FORMAT,
+    vendedor: str | None = None,
+    cliente: str | None = None,
+    origem: Origem | None = None,
+    vencimento_de: date | None = None,
+    vencimento_ate: date | None = None,
+    _user=Depends(require_role("admin", "operadora")),
+):
+    filters = {
+        "vendedor": vendedor,
+        "cliente": cliente,
+        "origem": origem,
+        "vencimento_de": vencimento_de,
+        "vencimento_ate": vencimento_ate,
+    }
+    chunks = export_service.export_overdue(filters, format, read_session_factory())
+    return _export_response(chunks, format, f"vencidos-{date.today().isoformat()}")
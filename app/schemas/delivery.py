@@ -0,0 +1,50 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+from app.schemas.report import RecipientType
+
+
+class DeliveryRecipient(BaseModel):
+    recipient_type: RecipientType = Field(..., examples=["VENDEDOR", "DIRETORIA"])
+    recipient_value: str | None = Field(default=None, examples=["João"])
+    destination: str | None = Field(default=None, examples=["5511999990000"])
+
+
+class DeliveryCreate(BaseModel):
+    report_type: str = Field(default="vencidos", examples=["vencidos"])
+    mode: str = Field(default="delta", pattern="^(full|delta)$", examples=["delta", "full"])
+    recipients: list[DeliveryRecipient] | None = None
+
+
+class DeliveryAttemptResponse(BaseModel):
+    attempt: int
+    status: str
+    error: str | None
+    provider_message_id: str | None
+    duration_ms: int
+    attempted_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class DeliveryJobResponse(BaseModel):
+    id: int
+    snapshot_id: int
+    recipient_type: str
+    recipient_value: str | None
+    destination: str
+    provider: str
+    status: str
+    attempts: int
+    next_attempt_at: datetime
+    last_error: str | None
+    created_at: datetime
+    sent_at: datetime | None
+
+    class Config:
+        orm_mode = True
+
+
+class DeliveryJobDetail(DeliveryJobResponse):
+    attempt_log: list[DeliveryAttemptResponse]
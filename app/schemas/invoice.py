@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from pydantic import BaseModel
 
@@ -20,3 +20,32 @@ class InvoiceUploadSummary(BaseModel):
     inserted: int
     skipped_invalid: int
     skipped_duplicates: int
+    skipped_file_duplicates: int
+    import_id: int | None = None
+    reused: bool = False
+
+
+class InvoiceFileUploadSummary(InvoiceUploadSummary):
+    file_name: str
+    source: str
+    error: str | None = None
+
+
+class InvoiceBatchUploadSummary(BaseModel):
+    files: list[InvoiceFileUploadSummary]
+    total: InvoiceUploadSummary
+
+
+class ImportJobResponse(BaseModel):
+    id: int
+    source_system: str
+    file_name: str | None
+    status: str
+    total_rows: int
+    inserted_rows: int
+    skipped_rows: int
+    imported_at: datetime
+    finished_at: datetime | None
+    error: str | None
+    summary: InvoiceUploadSummary | None
+    reused: bool = False
@@ -1,13 +1,25 @@
-from datetime import datetime
-from typing import Any
-from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Any, Literal
+from pydantic import BaseModel, Field, field_validator
+
+from app.utils.snapshot_codec import decode_rows
+
+RecipientType = Literal["DIRETORIA", "VENDEDOR"]
+SendMethod = Literal["EXPORT", "WHATSAPP"]
+Origem = Literal["ITAU", "CONTA_AZUL"]
 
 
 class ReportSnapshotCreate(BaseModel):
     report_type: str = Field(..., examples=["vencidos"])
-    recipient_type: str = Field(..., examples=["DIRETORIA", "VENDEDOR"])
-    method: str = Field(..., examples=["EXPORT", "WHATSAPP"])
+    recipient_type: RecipientType = Field(..., examples=["DIRETORIA", "VENDEDOR"])
+    method: SendMethod = Field(..., examples=["EXPORT", "WHATSAPP"])
     recipient_value: str | None = Field(default=None, examples=["Equipe Sul"])
+    vendedor: str | None = Field(default=None, examples=["João"])
+    cliente: str | None = Field(default=None, examples=["Empresa X"])
+    origem: Origem | None = Field(default=None, examples=["ITAU", "CONTA_AZUL"])
+    vencimento_de: date | None = Field(default=None, examples=["2024-01-01"])
+    vencimento_ate: date | None = Field(default=None, examples=["2024-03-31"])
+    mode: str = Field(default="full", pattern="^(full|delta)$", examples=["full", "delta"])
 
 
 class ReportSnapshotResponse(BaseModel):
@@ -16,8 +28,13 @@ class ReportSnapshotResponse(BaseModel):
     recipient_type: str
     method: str
     created_at: datetime
+    filters_json: dict[str, Any] | None = None
+    mode: str = "full"
+    base_snapshot_id: int | None = None
     data_json: list[dict[str, Any]]
 
+    _decode_data = field_validator("data_json", mode="before")(decode_rows)
+
     class Config:
         orm_mode = True
 
@@ -1,7 +1,7 @@
 import pyotp
 from sqlalchemy.orm import Session
 
-from app.core.security import create_access_token, hash_password, verify_password
+from app.core.security import create_access_token, hash_password, verify_and_update_password
 from app.models import User
 from app.repositories import user_repository
 
@@ -12,8 +12,15 @@ class AuthError(Exception):
 
 def authenticate_user(db: Session, username: str, password: str, totp_code: str | None) -> str:
     user = user_repository.get_by_username(db, username)
-    if not user or not verify_password(password, user.password_hash):
+    if not user:
         raise AuthError("Credenciais inválidas.")
+    valid, new_hash = verify_and_update_password(password, user.password_hash)
+    if not valid:
+        raise AuthError("Credenciais inválidas.")
+    if new_hash:
+        user.password_hash = new_hash
+        db.add(user)
+        db.commit()
     if user.is_2fa_enabled:
         if not totp_code:
             raise AuthError("Código TOTP obrigatório.")
@@ -0,0 +1,48 @@
+import asyncio
+import random
+import uuid
+
+
+class DeliveryProviderError(Exception):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class DeliveryProvider:
+    name = "base"
+
+    async def send(self, destination: str, message: str) -> str:
+        raise NotImplementedError
+
+
+class FakeWhatsAppProvider(DeliveryProvider):
+    name = "fake"
+
+    def __init__(self, latency_seconds: float = 0.0, failure_rate: float = 0.0, seed=None):
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+        self.sent: list[tuple[str, str]] = []
+        self._random = random.Random(seed)
+
+    async def send(self, destination: str, message: str) -> str:
+        if not destination.lstrip("+").isdigit():
+            raise DeliveryProviderError(f"Número inválido: {destination}", retryable=False)
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self._random.random() < self.failure_rate:
+            raise DeliveryProviderError("Falha simulada do provedor.")
+        self.sent.append((destination, message))
+        return uuid.uuid4().hex
+
+
+PROVIDERS: dict[str, type[DeliveryProvider]] = {FakeWhatsAppProvider.name: FakeWhatsAppProvider}
+
+
+def get_provider(name: str) -> DeliveryProvider:
+    # Sem padrão: o provedor fake marca envios como ENVIADO sem mandar nada.
+    if not name:
+        raise ValueError("Nenhum provedor de envio configurado (DELIVERY_PROVIDER).")
+    if name not in PROVIDERS:
+        raise ValueError(f"Provedor de envio desconhecido: {name}")
+    return PROVIDERS[name]()
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import observe_delivery
+from app.core.rate_limit import TokenBucket
+from app.models import DeliveryAttempt, DeliveryJob, ReportSnapshot, SendHistory
+from app.repositories import delivery_repository, dimension_repository
+from app.services import report_service
+from app.services.delivery_providers import DeliveryProvider, DeliveryProviderError, get_provider
+from app.utils.snapshot_codec import decode_rows, row_count
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4096
+
+
+class DeliveryError(Exception):
+    pass
+
+
+class DeliveryJobNotFound(Exception):
+    pass
+
+
+def _resolve_recipients(db: Session, recipients: list[dict] | None) -> list[dict]:
+    if recipients is None:
+        return [
+            {"recipient_type": "VENDEDOR", "recipient_value": name, "destination": phone}
+            for name, phone in dimension_repository.vendor_phones(db).items()
+        ]
+    names = [
+        recipient["recipient_value"]
+        for recipient in recipients
+        if recipient["recipient_type"] == "VENDEDOR" and not recipient.get("destination")
+    ]
+    phones = dimension_repository.vendor_phones(db, names) if names else {}
+    resolved = []
+    for recipient in recipients:
+        destination = recipient.get("destination") or phones.get(recipient["recipient_value"])
+        if not destination:
+            label = recipient["recipient_value"] or recipient["recipient_type"]
+            raise DeliveryError(f"Destinatário sem telefone cadastrado: {label}")
+        resolved.append({**recipient, "destination": destination})
+    return resolved
+
+
+def enqueue_deliveries(
+    db: Session,
+    report_type: str,
+    mode: str,
+    recipients: list[dict] | None,
+    user_id: int | None,
+) -> list[DeliveryJob]:
+    if not settings.delivery_provider:
+        raise DeliveryError("Nenhum provedor de envio configurado (DELIVERY_PROVIDER).")
+    jobs = []
+    for recipient in _resolve_recipients(db, recipients):
+        snapshot = report_service.create_snapshot(
+            db,
+            report_type,
+            recipient["recipient_type"],
+            "WHATSAPP",
+            recipient["recipient_value"],
+            mode=mode,
+            # O histórico (e a base dos próximos deltas) só é gravado quando o envio sai.
+            record_history=False,
+        )
+        # Delta vazio: nada mudou para esse destinatário, não há o que enviar.
+        if snapshot.mode == report_service.MODE_DELTA and not row_count(snapshot.data_json):
+            continue
+        jobs.append(
+            DeliveryJob(
+                snapshot_id=snapshot.id,
+                recipient_type=recipient["recipient_type"],
+                recipient_value=recipient["recipient_value"],
+                destination=recipient["destination"],
+                provider=settings.delivery_provider,
+                created_by=user_id,
+            )
+        )
+    return delivery_repository.create_jobs(db, jobs)
+
+
+def get_job(db: Session, job_id: int) -> DeliveryJob:
+    job = delivery_repository.get(db, job_id)
+    if not job:
+        raise DeliveryJobNotFound("Envio não encontrado.")
+    return job
+
+
+def list_jobs(db: Session, limit: int, status: str | None = None) -> list[DeliveryJob]:
+    return delivery_repository.list_jobs(db, limit, status)
+
+
+def render_message(snapshot: ReportSnapshot) -> str:
+    rows = decode_rows(snapshot.data_json)
+    title = f"Relatório {snapshot.report_type} - {snapshot.created_at:%d/%m/%Y}"
+    if snapshot.mode == report_service.MODE_DELTA:
+        title += " (alterações desde o último envio)"
+    lines = [title]
+    length = len(title)
+    for index, row in enumerate(rows):
+        line = " | ".join(str(value) for value in row.values())
+        suffix = f"... e mais {len(rows) - index} linhas"
+        if length + len(line) + len(suffix) + 2 > MAX_MESSAGE_LENGTH:
+            lines.append(suffix)
+            break
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+class DeliveryDispatcher:
+    def __init__(
+        self,
+        provider: DeliveryProvider | None = None,
+        concurrency: int = settings.delivery_concurrency,
+        bucket: TokenBucket | None = None,
+    ):
+        self.provider = provider or get_provider(settings.delivery_provider)
+        self.concurrency = concurrency
+        self.bucket = bucket or TokenBucket(
+            settings.delivery_rate_per_second, settings.delivery_burst
+        )
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(
+            settings.delivery_retry_base_seconds * 2 ** (attempts - 1),
+            settings.delivery_retry_max_seconds,
+        )
+        return delay * random.uniform(0.5, 1)
+
+    async def _deliver(
+        self, job: DeliveryJob, semaphore: asyncio.Semaphore
+    ) -> tuple[int, dict, DeliveryAttempt, SendHistory | None]:
+        message_id = error = None
+        retryable = True
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await self.bucket.acquire()
+                message_id = await self.provider.send(job.destination, render_message(job.snapshot))
+            except DeliveryProviderError as exc:
+                error, retryable = str(exc), exc.retryable
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            seconds = time.perf_counter() - started
+
+        now = datetime.utcnow()
+        if error is None:
+            values = {"status": "ENVIADO", "sent_at": now, "provider_message_id": message_id}
+        elif retryable and job.attempts < settings.delivery_max_attempts:
+            retry_at = now + timedelta(seconds=self._retry_delay(job.attempts))
+            values = {"status": "PENDENTE", "next_attempt_at": retry_at}
+        else:
+            values = {"status": "ERRO"}
+        values["last_error"] = error[:500] if error else None
+        observe_delivery(self.provider.name, values["status"], seconds)
+        attempt = DeliveryAttempt(
+            job_id=job.id,
+            attempt=job.attempts,
+            status="ENVIADO" if error is None else "FALHA",
+            error=values["last_error"],
+            provider_message_id=message_id,
+            duration_ms=int(seconds * 1000),
+            attempted_at=now,
+        )
+        history = None
+        if error is None:
+            history = SendHistory(
+                recipient_type=job.recipient_type,
+                recipient_value=job.recipient_value,
+                report_type=job.snapshot.report_type,
+                method="WHATSAPP",
+                sent_at=now,
+                snapshot_id=job.snapshot_id,
+            )
+        return job.id, values, attempt, history
+
+    async def run_once(self) -> int:
+        now = datetime.utcnow()
+        # O prazo cobre a fila inteira do lote passando pelo rate limit.
+        lease = settings.delivery_lease_seconds + settings.delivery_batch_size / self.bucket.rate
+        async with AsyncSessionLocal() as db:
+            jobs = await delivery_repository.claim_due_async(
+                db,
+                self.provider.name,
+                now,
+                now + timedelta(seconds=lease),
+                settings.delivery_batch_size,
+            )
+        if not jobs:
+            return 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._deliver(job, semaphore) for job in jobs))
+        async with AsyncSessionLocal() as db:
+            await delivery_repository.record_attempts_async(db, list(results))
+        return len(results)
+
+    async def run_forever(self, poll_seconds: float = settings.delivery_poll_seconds) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception:
+                logger.exception("Falha ao despachar envios.")
+                processed = 0
+            if not processed:
+                await asyncio.sleep(poll_seconds)
+
+
+if __name__ == "__main__":
+    asyncio.run(DeliveryDispatcher().run_forever())
@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import date
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.repositories import overdue_repository, report_repository
+from app.services.report_service import SnapshotNotFound, rebuild_rows
+from app.utils.snapshot_codec import decode_rows
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+FLUSH_ROWS = 1000
+XLSX_READ_SIZE = 64 * 1024
+
+
+class ExportError(Exception):
+    pass
+
+
+def _csv_chunks(columns: list[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for index, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if index % FLUSH_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson_chunks(columns: list[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str))
+        if len(lines) >= FLUSH_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _xlsx_chunks(columns: list[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(columns)
+    for row in rows:
+        sheet.append(row)
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while chunk := output.read(XLSX_READ_SIZE):
+            yield chunk
+
+
+WRITERS = {"csv": _csv_chunks, "ndjson": _ndjson_chunks, "xlsx": _xlsx_chunks}
+
+
+def _writer(export_format: str):
+    if export_format not in WRITERS:
+        raise ExportError(f"Formato de exportação inválido: {export_format}")
+    return WRITERS[export_format]
+
+
+def _overdue_values(row: tuple) -> tuple:
+    _, cliente, data_vencimento, descricao, valor_original, vendedor, origem = row
+    return cliente, data_vencimento, descricao, float(valor_original), vendedor, origem
+
+
+def export_overdue(
+    filters: dict, export_format: str, read_session_factory=SessionLocal
+) -> Iterator[bytes]:
+    writer = _writer(export_format)
+
+    def generate() -> Iterator[bytes]:
+        with SessionLocal() as db:
+            overdue_repository.refresh(db, date.today())
+        db = read_session_factory()
+        try:
+            rows = (_overdue_values(row) for row in overdue_repository.stream_rows(db, filters))
+            yield from writer(overdue_repository.COLUMNS, rows)
+        finally:
+            db.close()
+
+    return generate()
+
+
+def export_snapshot(
+    db: Session, snapshot_id: int, export_format: str, full: bool = False
+) -> Iterator[bytes]:
+    writer = _writer(export_format)
+    snapshot = report_repository.get_snapshot(db, snapshot_id)
+    if not snapshot:
+        raise SnapshotNotFound("Snapshot não encontrado.")
+    rows: list[dict[str, Any]] = (
+        rebuild_rows(db, snapshot) if full else decode_rows(snapshot.data_json)
+    )
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    return writer(columns, (tuple(row.get(column) for column in columns) for row in rows))
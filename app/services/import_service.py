@@ -0,0 +1,271 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import BinaryIO
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.metrics import deferred, replay
+from app.core.workers import get_process_pool, reset_process_pool
+from app.models import ImportBatch
+from app.repositories import import_repository
+from app.services import invoice_service
+from app.utils.uploads import file_checksum, store_upload
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+IN_FLIGHT = ("PENDENTE", "PROCESSANDO")
+STALE_ERROR = "Importação interrompida: o worker parou antes de concluir."
+
+
+class ImportJobNotFound(Exception):
+    pass
+
+
+def _counts(counts: invoice_service.UploadCounts) -> dict:
+    inserted, skipped_invalid, skipped_duplicates, skipped_file_duplicates = counts
+    skipped_rows = skipped_invalid + skipped_duplicates + skipped_file_duplicates
+    return {
+        "total_rows": inserted + skipped_rows,
+        "inserted_rows": inserted,
+        "skipped_rows": skipped_rows,
+        "skipped_invalid": skipped_invalid,
+        "skipped_duplicates": skipped_duplicates,
+        "skipped_file_duplicates": skipped_file_duplicates,
+    }
+
+
+def _progress(db: Session, batch: ImportBatch) -> invoice_service.ProgressCallback:
+    def on_progress(*counts: int) -> None:
+        import_repository.update(db, batch, **_counts(counts))
+
+    return on_progress
+
+
+# Jobs entregues ao pool deste processo e ainda não terminados: id -> arquivo.
+_queued: dict[int, str] = {}
+_queued_lock = threading.Lock()
+_heartbeat: threading.Thread | None = None
+
+
+def _heartbeat_loop() -> None:
+    # Na fila do pool um job não dá sinal de vida sozinho; este processo renova updated_at dos
+    # PENDENTE e o mtime dos arquivos para que nem _fail_stale_jobs nem a varredura os levem.
+    # Se o processo morre, a renovação para e o job fica parado de verdade.
+    while True:
+        time.sleep(settings.import_stale_seconds / 3)
+        with _queued_lock:
+            queued = dict(_queued)
+        if not queued:
+            continue
+        try:
+            with SessionLocal() as db:
+                import_repository.touch(db, list(queued), "PENDENTE")
+            for path in queued.values():
+                with suppress(FileNotFoundError):
+                    os.utime(path)
+        except Exception:
+            logger.exception("Falha ao renovar importações na fila.")
+
+
+def _track(batch_id: int, path: str, future: Future) -> None:
+    global _heartbeat
+    with _queued_lock:
+        _queued[batch_id] = path
+        if _heartbeat is None:
+            _heartbeat = threading.Thread(
+                target=_heartbeat_loop, name="import-heartbeat", daemon=True
+            )
+            _heartbeat.start()
+
+    def untrack(_: Future) -> None:
+        with _queued_lock:
+            _queued.pop(batch_id, None)
+
+    future.add_done_callback(untrack)
+
+
+def _fail_stale_jobs(db: Session) -> int:
+    # Sem sinal de vida (updated_at) há IMPORT_STALE_SECONDS, o processo que cuidava do job
+    # morreu ou reiniciou.
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.import_stale_seconds)
+    return import_repository.fail_stale(db, IN_FLIGHT, cutoff, STALE_ERROR)
+
+
+def _previous(
+    db: Session, source: str, checksum: str, statuses: tuple[str, ...], force: bool
+) -> ImportBatch | None:
+    if force:
+        return None
+    return import_repository.find_by_checksum(db, source, checksum, statuses)
+
+
+def upload_file(
+    db: Session,
+    source: str,
+    file: BinaryIO,
+    filename: str,
+    user_id: int | None,
+    force: bool = False,
+) -> tuple[ImportBatch, bool]:
+    checksum = file_checksum(file)
+    previous = _previous(db, source, checksum, ("CONCLUIDO",), force)
+    if previous:
+        return previous, True
+    batch = import_repository.create(
+        db,
+        ImportBatch(
+            source_system=source,
+            file_name=filename,
+            file_checksum=checksum,
+            imported_by=user_id,
+            status="PROCESSANDO",
+        ),
+    )
+    try:
+        counts = invoice_service.upload(db, source, file, filename, _progress(db, batch))
+    except Exception as exc:
+        db.rollback()
+        import_repository.update(
+            db, batch, status="ERRO", error=str(exc)[:500], finished_at=datetime.utcnow()
+        )
+        raise
+    import_repository.update(
+        db, batch, status="CONCLUIDO", finished_at=datetime.utcnow(), **_counts(counts)
+    )
+    return batch, False
+
+
+def upload_batch(
+    db: Session,
+    files: list[tuple[str, BinaryIO, str]],
+    user_id: int | None,
+    force: bool = False,
+) -> list[tuple[str, str, ImportBatch, bool]]:
+    results: dict[int, tuple[str, str, ImportBatch, bool]] = {}
+    pending = []
+    for index, (source, file, filename) in enumerate(files):
+        checksum = file_checksum(file)
+        previous = _previous(db, source, checksum, ("CONCLUIDO",), force)
+        if previous:
+            results[index] = (filename, source, previous, True)
+        else:
+            pending.append((index, checksum))
+    if pending:
+        parsed = invoice_service.upload_batch(db, [files[index] for index, _ in pending])
+        for (index, checksum), (filename, source, counts, error) in zip(pending, parsed):
+            batch = import_repository.create(
+                db,
+                ImportBatch(
+                    source_system=source,
+                    file_name=filename,
+                    file_checksum=checksum,
+                    imported_by=user_id,
+                    status="ERRO" if error else "CONCLUIDO",
+                    error=error[:500] if error else None,
+                    finished_at=datetime.utcnow(),
+                    **(_counts(counts) if counts else {}),
+                ),
+            )
+            results[index] = (filename, source, batch, False)
+    return [results[index] for index in range(len(files))]
+
+
+def enqueue_import(
+    db: Session,
+    source: str,
+    file: BinaryIO,
+    filename: str,
+    user_id: int | None,
+    force: bool = False,
+) -> tuple[ImportBatch, bool]:
+    path, checksum = store_upload(file, filename)
+    # Um reenvio idêntico reaproveita a importação concluída ou ainda viva; jobs parados são
+    # marcados como ERRO antes, para não prenderem o arquivo.
+    if not force:
+        _fail_stale_jobs(db)
+    previous = _previous(db, source, checksum, (*IN_FLIGHT, "CONCLUIDO"), force)
+    if previous:
+        os.remove(path)
+        return previous, True
+    batch = import_repository.create(
+        db,
+        ImportBatch(
+            source_system=source,
+            file_name=filename,
+            file_checksum=checksum,
+            imported_by=user_id,
+        ),
+    )
+    try:
+        future = get_process_pool().submit(run_import, batch.id, source, path, filename)
+    except BrokenProcessPool:
+        # Um worker que morre quebra o pool inteiro; um pool novo assume os próximos envios.
+        reset_process_pool()
+        future = get_process_pool().submit(run_import, batch.id, source, path, filename)
+    _track(batch.id, path, future)
+    future.add_done_callback(_replay_metrics)
+    return batch, False
+
+
+def _replay_metrics(future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        replay(future.result())
+
+
+def run_import(batch_id: int, source: str, path: str, filename: str) -> list[tuple]:
+    with deferred() as observations:
+        _run_import(batch_id, source, path, filename)
+    return observations
+
+
+def _run_import(batch_id: int, source: str, path: str, filename: str) -> None:
+    db = SessionLocal()
+    try:
+        batch = import_repository.get(db, batch_id)
+        # A varredura de importações paradas pode já ter marcado o job como ERRO.
+        if not batch or batch.status != "PENDENTE":
+            return
+        import_repository.update(db, batch, status="PROCESSANDO")
+        with open(path, "rb") as file:
+            invoice_service.upload(db, source, file, filename, _progress(db, batch))
+        import_repository.update(db, batch, status="CONCLUIDO", finished_at=datetime.utcnow())
+    except Exception as exc:
+        db.rollback()
+        batch = import_repository.get(db, batch_id)
+        if batch:
+            import_repository.update(
+                db, batch, status="ERRO", error=str(exc)[:500], finished_at=datetime.utcnow()
+            )
+    finally:
+        db.close()
+        with suppress(FileNotFoundError):
+            os.remove(path)
+
+
+def sweep_stale_imports(db: Session) -> tuple[int, int]:
+    failed = _fail_stale_jobs(db)
+    removed = 0
+    if os.path.isdir(settings.import_storage_dir):
+        oldest = time.time() - settings.import_stale_seconds
+        for entry in os.scandir(settings.import_storage_dir):
+            with suppress(FileNotFoundError):
+                if entry.is_file() and entry.stat().st_mtime < oldest:
+                    os.remove(entry.path)
+                    removed += 1
+    return failed, removed
+
+
+def get_import(db: Session, batch_id: int) -> ImportBatch:
+    batch = import_repository.get(db, batch_id)
+    if not batch:
+        raise ImportJobNotFound("Importação não encontrada.")
+    return batch
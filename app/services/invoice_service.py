@@ -1,61 +1,183 @@
-from datetime import date
-from decimal import Decimal
-from typing import Iterable
+import os
+import time
+from concurrent.futures import wait
+from typing import BinaryIO, Callable, Iterable
 
 from sqlalchemy.orm import Session
 
-from app.models import Invoice
-from app.repositories import invoice_repository
-from app.utils.excel_parsers import ExcelParseError, parse_conta_azul, parse_itau
+from app.core.dimension_cache import invoice_fingerprint_cache
+from app.core.metrics import deferred, observe_persist, replay
+from app.core.partitions import retention_cutoff
+from app.core.workers import get_process_pool
+from app.repositories import dimension_repository, invoice_repository
+from app.utils.excel_parsers import ExcelParseError, iter_conta_azul, iter_itau, list_sheets
+from app.utils.uploads import store_upload
+
+
+BATCH_SIZE = 1000
 
 
 class InvoiceValidationError(Exception):
     pass
 
 
-def _is_valid(row: dict, today: date) -> bool:
-    if not row.get("cliente") or not row.get("descricao") or not row.get("vendedor"):
-        return False
-    if not row.get("data_vencimento") or row["data_vencimento"] >= today:
-        return False
-    if Decimal(row.get("valor_original", 0)) <= 0:
-        return False
-    return True
+ProgressCallback = Callable[[int, int, int, int], None]
+UploadCounts = tuple[int, int, int, int]
+
+
+def _with_dimensions(db: Session, rows: list[dict]) -> list[dict]:
+    client_ids = dimension_repository.resolve_clients(db, (row["cliente"] for row in rows))
+    vendor_ids = dimension_repository.resolve_vendors(db, (row["vendedor"] for row in rows))
+    resolved = []
+    for row in rows:
+        row = dict(row)
+        row["client_id"] = client_ids[row.pop("cliente")]
+        row["vendor_id"] = vendor_ids[row.pop("vendedor")]
+        resolved.append(row)
+    dimension_repository.link_client_vendors(
+        db, ((row["client_id"], row["vendor_id"]) for row in resolved)
+    )
+    return resolved
 
 
-def _save_invoices(db: Session, rows: Iterable[dict]) -> tuple[int, int, int]:
+def _save_invoices(
+    db: Session,
+    chunks: Iterable[tuple[list[dict], int]],
+    on_progress: ProgressCallback | None = None,
+    seen: set[bytes] | None = None,
+) -> UploadCounts:
+    seen = set() if seen is None else seen
     inserted = 0
     skipped_invalid = 0
-    skipped_duplicates = 0
-    today = date.today()
+    file_duplicates = 0
+    candidates = 0
+    persist_seconds = 0.0
+    cutoff = retention_cutoff(db.get_bind())
 
-    for row in rows:
-        if not _is_valid(row, today):
-            skipped_invalid += 1
-            continue
-        duplicate = invoice_repository.find_duplicate(
-            db,
-            cliente=row["cliente"],
-            data_vencimento=row["data_vencimento"],
-            valor_original=row["valor_original"],
-            descricao=row["descricao"],
-            origem=row["origem"],
-        )
-        if duplicate:
-            skipped_duplicates += 1
-            continue
-        invoice = Invoice(**row)
-        invoice_repository.create(db, invoice)
-        inserted += 1
-
-    return inserted, skipped_invalid, skipped_duplicates
-
-
-def upload_itau(db: Session, content: bytes) -> tuple[int, int, int]:
-    rows = parse_itau(content)
-    return _save_invoices(db, rows)
-
-
-def upload_conta_azul(db: Session, content: bytes) -> tuple[int, int, int]:
-    rows = parse_conta_azul(content)
-    return _save_invoices(db, rows)
+    for rows, invalid in chunks:
+        if cutoff:
+            # Sem o título arquivado para comparar, a linha voltaria duplicada a invoices.
+            kept = [row for row in rows if row["data_vencimento"] >= cutoff]
+            invalid += len(rows) - len(kept)
+            rows = kept
+        skipped_invalid += invalid
+        unique_rows = []
+        for row in rows:
+            if row["dedup_fingerprint"] in seen:
+                file_duplicates += 1
+                continue
+            seen.add(row["dedup_fingerprint"])
+            unique_rows.append(row)
+        started = time.perf_counter()
+        if invoice_fingerprint_cache.max_size > 0:
+            # Linhas já gravadas por uploads anteriores não voltam ao banco.
+            known, _ = invoice_fingerprint_cache.get_many(
+                row["dedup_fingerprint"] for row in unique_rows
+            )
+            candidates += len(known)
+            unique_rows = [row for row in unique_rows if row["dedup_fingerprint"] not in known]
+        for start in range(0, len(unique_rows), BATCH_SIZE):
+            batch = unique_rows[start : start + BATCH_SIZE]
+            inserted += invoice_repository.bulk_create(db, _with_dimensions(db, batch))
+            candidates += len(batch)
+        persist_seconds += time.perf_counter() - started
+        if on_progress:
+            on_progress(inserted, skipped_invalid, candidates - inserted, file_duplicates)
+
+    observe_persist(persist_seconds, inserted, candidates - inserted, file_duplicates)
+    return inserted, skipped_invalid, candidates - inserted, file_duplicates
+
+
+PARSERS = {"ITAU": iter_itau, "CONTA_AZUL": iter_conta_azul}
+
+
+def upload(
+    db: Session,
+    source: str,
+    file: BinaryIO,
+    filename: str = "",
+    on_progress: ProgressCallback | None = None,
+) -> UploadCounts:
+    return _save_invoices(db, PARSERS[source](file, filename), on_progress)
+
+
+def upload_itau(db: Session, file: BinaryIO, filename: str = "") -> UploadCounts:
+    return upload(db, "ITAU", file, filename)
+
+
+def upload_conta_azul(db: Session, file: BinaryIO, filename: str = "") -> UploadCounts:
+    return upload(db, "CONTA_AZUL", file, filename)
+
+
+def _parse_sheet(
+    source: str, path: str, filename: str, sheet_name: str | None
+) -> tuple[tuple[list[dict], int], list[tuple]]:
+    rows: list[dict] = []
+    skipped_invalid = 0
+    with deferred() as observations, open(path, "rb") as file:
+        for chunk, invalid in PARSERS[source](file, filename, sheet_name=sheet_name):
+            rows.extend(chunk)
+            skipped_invalid += invalid
+    return (rows, skipped_invalid), observations
+
+
+def _sheet_error(filename: str, sheet: str | None, exc: Exception) -> str:
+    return f"{filename} ({sheet}): {exc}" if sheet else f"{filename}: {exc}"
+
+
+def upload_batch(
+    db: Session, files: list[tuple[str, BinaryIO, str]]
+) -> list[tuple[str, str, UploadCounts | None, str | None]]:
+    paths: list[str] = []
+    futures = []
+    try:
+        # Cada caminho entra na lista assim que é gravado: uma falha no meio ainda limpa os
+        # arquivos anteriores.
+        for _, file, filename in files:
+            paths.append(store_upload(file, filename)[0])
+        pool = get_process_pool("parsing")
+        errors: dict[int, str] = {}
+        for index, ((source, _, filename), path) in enumerate(zip(files, paths)):
+            with open(path, "rb") as file:
+                try:
+                    sheets = list_sheets(file, filename)
+                except ExcelParseError as exc:
+                    errors[index] = _sheet_error(filename, None, exc)
+                    sheets = []
+            futures.append(
+                [
+                    (sheet, pool.submit(_parse_sheet, source, path, filename, sheet))
+                    for sheet in sheets
+                ]
+            )
+
+        # Uma aba inválida descarta só o arquivo dela; os demais arquivos do lote são gravados.
+        parsed = []
+        for index, ((_, _, filename), file_futures) in enumerate(zip(files, futures)):
+            chunks = []
+            for sheet, future in file_futures:
+                try:
+                    chunk, observations = future.result()
+                except ExcelParseError as exc:
+                    errors.setdefault(index, _sheet_error(filename, sheet, exc))
+                    continue
+                replay(observations)
+                chunks.append(chunk)
+            parsed.append(chunks)
+
+        seen: set[bytes] = set()
+        results = []
+        for index, ((source, _, filename), chunks) in enumerate(zip(files, parsed)):
+            if index in errors:
+                results.append((filename, source, None, errors[index]))
+            else:
+                results.append((filename, source, _save_invoices(db, chunks, seen=seen), None))
+        return results
+    finally:
+        # Abas ainda na fila não devem abrir um arquivo já removido.
+        pending = [future for file_futures in futures for _, future in file_futures]
+        for future in pending:
+            future.cancel()
+        wait(pending)
+        for path in paths:
+            os.remove(path)
@@ -1,9 +1,146 @@
-from datetime import date
+import base64
+import time
+from datetime import date, datetime
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
+from app.core.metrics import observe_snapshot
 from app.models import ReportSnapshot, SendHistory
-from app.repositories import invoice_repository, report_repository
+from app.repositories import overdue_repository, report_repository
+from app.utils.snapshot_codec import decode_rows, encode_rows
+
+settings = get_settings()
+
+
+FILTER_FIELDS = ("vendedor", "cliente", "origem", "vencimento_de", "vencimento_ate")
+
+
+def _overdue_rows(db: Session, filters: dict, today: date) -> list[dict]:
+    return [
+        {
+            "invoice_id": invoice_id,
+            "cliente": cliente,
+            "data_vencimento": str(data_vencimento),
+            "descricao": descricao,
+            "valor_original": float(valor_original),
+            "vendedor": vendedor,
+            "origem": origem,
+        }
+        for invoice_id, cliente, data_vencimento, descricao, valor_original, vendedor, origem in (
+            overdue_repository.list_rows(db, filters)
+        )
+    ]
+
+
+def _totals_by_vendedor(db: Session, filters: dict, today: date) -> list[dict]:
+    return [
+        {"vendedor": vendedor, "quantidade": quantidade, "valor_total": float(valor_total)}
+        for vendedor, quantidade, valor_total in overdue_repository.totals_by_vendedor(
+            db, filters
+        )
+    ]
+
+
+def _aging(db: Session, filters: dict, today: date) -> list[dict]:
+    buckets = {
+        faixa: (quantidade, valor_total)
+        for faixa, quantidade, valor_total in overdue_repository.aging_buckets(db, today, filters)
+    }
+    labels = [label for _, label in overdue_repository.AGING_BUCKETS]
+    labels.append(overdue_repository.AGING_OVERFLOW)
+    return [
+        {
+            "faixa": label,
+            "quantidade": buckets.get(label, (0, 0))[0],
+            "valor_total": float(buckets.get(label, (0, 0))[1]),
+        }
+        for label in labels
+    ]
+
+
+REPORT_BUILDERS = {"totais_por_vendedor": _totals_by_vendedor, "aging": _aging}
+
+MODE_FULL = "full"
+MODE_DELTA = "delta"
+DELTA_COLUMN = "situacao"
+DELTA_ADDED = "novo"
+DELTA_CHANGED = "alterado"
+DELTA_RESOLVED = "resolvido"
+
+
+def _row_key(row: dict) -> int | tuple:
+    # Snapshots gravados antes de invoice_id entrar nas linhas continuam casando pelo conteúdo.
+    # A codificação colunar preenche a coluna ausente com None.
+    if row.get("invoice_id") is not None:
+        return row["invoice_id"]
+    return (
+        row["cliente"],
+        row["data_vencimento"],
+        row["descricao"],
+        row["valor_original"],
+        row["origem"],
+    )
+
+
+def _diff_rows(base_rows: list[dict], rows: list[dict]) -> list[dict]:
+    base = {_row_key(row): row for row in base_rows}
+    delta = []
+    for row in rows:
+        previous = base.pop(_row_key(row), None)
+        if previous is None:
+            delta.append({**row, DELTA_COLUMN: DELTA_ADDED})
+        elif previous != row:
+            delta.append({**row, DELTA_COLUMN: DELTA_CHANGED})
+    delta.extend({**row, DELTA_COLUMN: DELTA_RESOLVED} for row in base.values())
+    return delta
+
+
+def _apply_delta(rows: list[dict], delta: list[dict]) -> list[dict]:
+    by_key = {_row_key(row): row for row in rows}
+    for change in delta:
+        row = {key: value for key, value in change.items() if key != DELTA_COLUMN}
+        if change[DELTA_COLUMN] == DELTA_RESOLVED:
+            by_key.pop(_row_key(row), None)
+        else:
+            by_key[_row_key(row)] = row
+    return list(by_key.values())
+
+
+def _snapshot_chain(db: Session, snapshot: ReportSnapshot) -> list[ReportSnapshot]:
+    chain = [snapshot]
+    while chain[-1].base_snapshot_id:
+        chain.append(report_repository.get_snapshot(db, chain[-1].base_snapshot_id))
+    return chain
+
+
+def rebuild_rows(db: Session, snapshot: ReportSnapshot) -> list[dict]:
+    chain = _snapshot_chain(db, snapshot)
+    rows = decode_rows(chain[-1].data_json)
+    for delta in reversed(chain[:-1]):
+        rows = _apply_delta(rows, decode_rows(delta.data_json))
+    return rows
+
+
+def _delta_base(
+    db: Session,
+    report_type: str,
+    recipient_type: str,
+    recipient_value: str | None,
+    filters_json: dict,
+) -> tuple[ReportSnapshot, list[dict]] | None:
+    base = report_repository.last_sent_snapshot(db, recipient_type, recipient_value, report_type)
+    if base is None or base.filters_json != filters_json:
+        return None
+    # Cadeias longas encarecem a reconstrução; acima do limite o envio volta a ser completo.
+    if len(_snapshot_chain(db, base)) >= settings.snapshot_delta_max_chain:
+        return None
+    rows = rebuild_rows(db, base)
+    # Base sem invoice_id: o delta trocaria todas as linhas e sairia maior que o snapshot completo.
+    if any(row.get("invoice_id") is None for row in rows):
+        return None
+    return base, rows
 
 
 def create_snapshot(
@@ -12,39 +149,113 @@ def create_snapshot(
     recipient_type: str,
     method: str,
     recipient_value: str | None,
+    filters: dict | None = None,
+    mode: str = MODE_FULL,
+    record_history: bool = True,
 ) -> ReportSnapshot:
+    started = time.perf_counter()
     today = date.today()
-    invoices = invoice_repository.list_overdue(db, today)
-    data_json = [
-        {
-            "cliente": invoice.cliente,
-            "data_vencimento": str(invoice.data_vencimento),
-            "descricao": invoice.descricao,
-            "valor_original": float(invoice.valor_original),
-            "vendedor": invoice.vendedor,
-            "origem": invoice.origem,
-        }
-        for invoice in invoices
-    ]
+    filters = {key: value for key, value in (filters or {}).items() if value}
+    if recipient_type == "VENDEDOR" and recipient_value and "vendedor" not in filters:
+        filters["vendedor"] = recipient_value
+
+    overdue_repository.refresh(db, today)
+    data_json = REPORT_BUILDERS.get(report_type, _overdue_rows)(db, filters, today)
+    filters_json = {
+        "only_overdue": True,
+        **{
+            key: value.isoformat() if isinstance(value, date) else value
+            for key, value in filters.items()
+        },
+    }
+
+    # Relatórios agregados já são pequenos; só a lista de vencidos é enviada como delta.
+    base = None
+    if mode == MODE_DELTA and report_type not in REPORT_BUILDERS:
+        base = _delta_base(db, report_type, recipient_type, recipient_value, filters_json)
+    if base:
+        data_json = _diff_rows(base[1], data_json)
+
     snapshot = ReportSnapshot(
         report_type=report_type,
         recipient_type=recipient_type,
         method=method,
-        data_json=data_json,
-        filters_json={"only_overdue": True},
+        data_json=encode_rows(data_json, settings.snapshot_encoding),
+        filters_json=filters_json,
+        mode=MODE_DELTA if base else MODE_FULL,
+        base_snapshot_id=base[0].id if base else None,
     )
     snapshot = report_repository.create_snapshot(db, snapshot)
-
-    history = SendHistory(
-        recipient_type=recipient_type,
-        recipient_value=recipient_value,
-        report_type=report_type,
-        method=method,
-        snapshot_id=snapshot.id,
+    observe_snapshot(
+        report_type if report_type in REPORT_BUILDERS else "vencidos",
+        time.perf_counter() - started,
+        len(data_json),
     )
-    report_repository.create_history(db, history)
+
+    if record_history:
+        history = SendHistory(
+            recipient_type=recipient_type,
+            recipient_value=recipient_value,
+            report_type=report_type,
+            method=method,
+            snapshot_id=snapshot.id,
+        )
+        report_repository.create_history(db, history)
+    return snapshot
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class SnapshotNotFound(Exception):
+    pass
+
+
+def _encode_cursor(history: SendHistory) -> str:
+    raw = f"{history.sent_at.isoformat()}|{history.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        sent_at, history_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode().split("|")
+        return datetime.fromisoformat(sent_at), int(history_id)
+    except ValueError as exc:
+        raise InvalidCursor("Cursor inválido.") from exc
+
+
+def _page(items: list[SendHistory], limit: int) -> tuple[list[SendHistory], str | None]:
+    if len(items) > limit:
+        items = items[:limit]
+        return items, _encode_cursor(items[-1])
+    return items, None
+
+
+def list_history(
+    db: Session, limit: int, cursor: str | None = None, **filters
+) -> tuple[list[SendHistory], str | None]:
+    after = _decode_cursor(cursor) if cursor else None
+    return _page(report_repository.list_history(db, limit + 1, after=after, **filters), limit)
+
+
+async def list_history_async(
+    db: AsyncSession, limit: int, cursor: str | None = None, **filters
+) -> tuple[list[SendHistory], str | None]:
+    after = _decode_cursor(cursor) if cursor else None
+    items = await report_repository.list_history_async(db, limit + 1, after=after, **filters)
+    return _page(items, limit)
+
+
+async def get_snapshot_async(db: AsyncSession, snapshot_id: int) -> ReportSnapshot:
+    snapshot = await report_repository.get_snapshot_async(db, snapshot_id)
+    if not snapshot:
+        raise SnapshotNotFound("Snapshot não encontrado.")
     return snapshot
 
 
-def list_history(db: Session) -> list[SendHistory]:
-    return report_repository.list_history(db)
+def get_full_snapshot(db: Session, snapshot_id: int) -> tuple[ReportSnapshot, list[dict]]:
+    snapshot = report_repository.get_snapshot(db, snapshot_id)
+    if not snapshot:
+        raise SnapshotNotFound("Snapshot não encontrado.")
+    return snapshot, rebuild_rows(db, snapshot)
@@ -1,8 +1,19 @@
-from decimal import Decimal
-from typing import Any
+from __future__ import annotations
 
-import pandas as pd
+import time
+from datetime import date
+from decimal import Decimal
 from io import BytesIO
+from typing import TYPE_CHECKING, Any, BinaryIO, Iterator
+from zipfile import BadZipFile
+
+from app.core.metrics import observe_parse
+from app.utils.fingerprint import dedup_fingerprint
+
+# pandas e openpyxl só são importados no primeiro parse; workers que não recebem planilhas
+# sobem sem eles.
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class ExcelParseError(Exception):
@@ -25,6 +36,10 @@ CONTA_AZUL_COLUMNS = {
     "vendedor": ["vendedor", "responsavel", "conta"],
 }
 
+TEXT_FIELDS = ["cliente", "descricao", "vendedor"]
+
+CHUNK_SIZE = 5000
+
 
 def _normalize_columns(df: pd.DataFrame) -> dict[str, str]:
     normalized = {col.lower().strip(): col for col in df.columns}
@@ -39,7 +54,7 @@ def _pick_column(columns: dict[str, str], candidates: list[str]) -> str | None:
     return None
 
 
-def _build_rows(df: pd.DataFrame, mapping: dict[str, list[str]]) -> list[dict[str, Any]]:
+def _resolve_columns(df: pd.DataFrame, mapping: dict[str, list[str]]) -> dict[str, str]:
     columns = _normalize_columns(df)
     resolved = {}
     for target, candidates in mapping.items():
@@ -47,43 +62,210 @@ def _build_rows(df: pd.DataFrame, mapping: dict[str, list[str]]) -> list[dict[st
         if not source:
             raise ExcelParseError(f"Coluna obrigatória ausente: {target}")
         resolved[target] = source
+    return resolved
+
+
+def _clean_text(series: pd.Series) -> pd.Series:
+    return series.where(series.notna(), "").astype(str).str.strip()
+
+
+def _to_dates(series: pd.Series) -> pd.Series:
+    import pandas as pd
 
-    rows = []
-    for _, record in df.iterrows():
-        rows.append(
-            {
-                "cliente": record[resolved["cliente"]],
-                "data_vencimento": record[resolved["data_vencimento"]],
-                "descricao": record[resolved["descricao"]],
-                "valor_original": record[resolved["valor_original"]],
-                "vendedor": record[resolved["vendedor"]],
-            }
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series, errors="coerce", format="mixed")
+
+
+def _normalize_frame(df: pd.DataFrame, mapping: dict[str, list[str]]) -> pd.DataFrame:
+    import pandas as pd
+
+    resolved = _resolve_columns(df, mapping)
+    frame = pd.DataFrame({target: df[source] for target, source in resolved.items()})
+    for field in TEXT_FIELDS:
+        frame[field] = _clean_text(frame[field])
+    frame["data_vencimento"] = _to_dates(frame["data_vencimento"])
+    frame["valor_original"] = pd.to_numeric(frame["valor_original"], errors="coerce")
+    return frame
+
+
+def _valid_mask(frame: pd.DataFrame, today: date) -> pd.Series:
+    import pandas as pd
+
+    mask = frame["data_vencimento"] < pd.Timestamp(today)
+    mask &= frame["valor_original"] > 0
+    for field in TEXT_FIELDS:
+        mask &= frame[field] != ""
+    return mask
+
+
+def _to_rows(frame: pd.DataFrame, origem: str) -> list[dict[str, Any]]:
+    dates = frame["data_vencimento"].dt.date.tolist()
+    values = [Decimal(str(value)) for value in frame["valor_original"].tolist()]
+    return [
+        {
+            "cliente": cliente,
+            "data_vencimento": data_vencimento,
+            "descricao": descricao,
+            "valor_original": valor_original,
+            "vendedor": vendedor,
+            "origem": origem,
+            "dedup_fingerprint": dedup_fingerprint(
+                cliente, data_vencimento, valor_original, descricao, origem
+            ),
+        }
+        for cliente, data_vencimento, descricao, valor_original, vendedor in zip(
+            frame["cliente"].tolist(),
+            dates,
+            frame["descricao"].tolist(),
+            values,
+            frame["vendedor"].tolist(),
         )
-    return rows
+    ]
 
 
-def _normalize_row(row: dict[str, Any], origem: str) -> dict[str, Any]:
-    return {
-        "cliente": str(row["cliente"]).strip() if row["cliente"] is not None else "",
-        "data_vencimento": pd.to_datetime(row["data_vencimento"], errors="coerce").date()
-        if row["data_vencimento"] is not None
-        else None,
-        "descricao": str(row["descricao"]).strip() if row["descricao"] is not None else "",
-        "valor_original": Decimal(str(row["valor_original"]))
-        if row["valor_original"] is not None
-        else Decimal("0"),
-        "vendedor": str(row["vendedor"]).strip() if row["vendedor"] is not None else "",
-        "origem": origem,
-    }
+def _parse_frame(
+    df: pd.DataFrame, mapping: dict[str, list[str]], origem: str, today: date
+) -> tuple[list[dict[str, Any]], int]:
+    frame = _normalize_frame(df, mapping)
+    mask = _valid_mask(frame, today)
+    return _to_rows(frame[mask], origem), int((~mask).sum())
 
 
-def parse_itau(content: bytes) -> list[dict[str, Any]]:
+def parse_itau(content: bytes, today: date | None = None) -> tuple[list[dict[str, Any]], int]:
+    import pandas as pd
+
+    started = time.perf_counter()
     df = pd.read_excel(BytesIO(content))
-    rows = _build_rows(df, ITAU_COLUMNS)
-    return [_normalize_row(row, "ITAU") for row in rows]
+    result = _parse_frame(df, ITAU_COLUMNS, "ITAU", today or date.today())
+    observe_parse("ITAU", time.perf_counter() - started, len(df))
+    return result
+
 
+def parse_conta_azul(
+    content: bytes, today: date | None = None
+) -> tuple[list[dict[str, Any]], int]:
+    import pandas as pd
 
-def parse_conta_azul(content: bytes) -> list[dict[str, Any]]:
+    started = time.perf_counter()
     df = pd.read_excel(BytesIO(content))
-    rows = _build_rows(df, CONTA_AZUL_COLUMNS)
-    return [_normalize_row(row, "CONTA_AZUL") for row in rows]
+    result = _parse_frame(df, CONTA_AZUL_COLUMNS, "CONTA_AZUL", today or date.today())
+    observe_parse("CONTA_AZUL", time.perf_counter() - started, len(df))
+    return result
+
+
+def _header_names(header: tuple) -> list[str]:
+    names = [
+        str(value) if value is not None else f"Unnamed: {index}"
+        for index, value in enumerate(header)
+    ]
+    # Cabeçalhos repetidos ganham sufixo ".1", ".2", como no pd.read_excel; sem isso df[coluna]
+    # devolveria um DataFrame.
+    taken = set(names)
+    counts: dict[str, int] = {}
+    for index, name in enumerate(names):
+        base = name
+        count = counts.get(base, 0)
+        while count > 0:
+            counts[base] = count + 1
+            name = f"{base}.{count}"
+            count = count + 1 if name in taken else counts.get(name, 0)
+        names[index] = name
+        counts[name] = count + 1
+    return names
+
+
+def _iter_csv_frames(fileobj: BinaryIO, chunk_size: int) -> Iterator[pd.DataFrame]:
+    import pandas as pd
+
+    yield from pd.read_csv(fileobj, chunksize=chunk_size)
+
+
+def _open_workbook(fileobj: BinaryIO):
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        return load_workbook(fileobj, read_only=True, data_only=True)
+    except (BadZipFile, InvalidFileException, KeyError) as exc:
+        raise ExcelParseError("Arquivo de planilha inválido.") from exc
+
+
+def list_sheets(fileobj: BinaryIO, filename: str = "") -> list[str | None]:
+    if filename.lower().endswith(".csv"):
+        return [None]
+    workbook = _open_workbook(fileobj)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def _iter_xlsx_frames(
+    fileobj: BinaryIO, chunk_size: int, sheet_name: str | None = None
+) -> Iterator[pd.DataFrame]:
+    import pandas as pd
+
+    workbook = _open_workbook(fileobj)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        records = sheet.iter_rows(values_only=True)
+        columns = _header_names(next(records, ()))
+        width = len(columns)
+        chunk = []
+        for record in records:
+            chunk.append(record[:width] + (None,) * (width - len(record)))
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame.from_records(chunk, columns=columns)
+                chunk = []
+        yield pd.DataFrame.from_records(chunk, columns=columns)
+    finally:
+        workbook.close()
+
+
+def iter_chunks(
+    fileobj: BinaryIO,
+    mapping: dict[str, list[str]],
+    origem: str,
+    filename: str = "",
+    chunk_size: int = CHUNK_SIZE,
+    today: date | None = None,
+    sheet_name: str | None = None,
+) -> Iterator[tuple[list[dict[str, Any]], int]]:
+    today = today or date.today()
+    if filename.lower().endswith(".csv"):
+        frames = _iter_csv_frames(fileobj, chunk_size)
+    else:
+        frames = _iter_xlsx_frames(fileobj, chunk_size, sheet_name)
+    elapsed = 0.0
+    rows = 0
+    started = time.perf_counter()
+    for df in frames:
+        chunk = _parse_frame(df, mapping, origem, today)
+        elapsed += time.perf_counter() - started
+        rows += len(df)
+        yield chunk
+        started = time.perf_counter()
+    observe_parse(origem, elapsed + time.perf_counter() - started, rows)
+
+
+def iter_itau(
+    fileobj: BinaryIO,
+    filename: str = "",
+    chunk_size: int = CHUNK_SIZE,
+    sheet_name: str | None = None,
+) -> Iterator[tuple[list[dict[str, Any]], int]]:
+    return iter_chunks(
+        fileobj, ITAU_COLUMNS, "ITAU", filename, chunk_size, sheet_name=sheet_name
+    )
+
+
+def iter_conta_azul(
+    fileobj: BinaryIO,
+    filename: str = "",
+    chunk_size: int = CHUNK_SIZE,
+    sheet_name: str | None = None,
+) -> Iterator[tuple[list[dict[str, Any]], int]]:
+    return iter_chunks(
+        fileobj, CONTA_AZUL_COLUMNS, "CONTA_AZUL", filename, chunk_size, sheet_name=sheet_name
+    )
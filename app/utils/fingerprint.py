@@ -0,0 +1,22 @@
+import hashlib
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+FINGERPRINT_BYTES = 16
+CENTS = Decimal("0.01")
+
+
+def dedup_fingerprint(
+    cliente: str, data_vencimento: date, valor_original, descricao: str, origem: str
+) -> bytes:
+    valor = Decimal(str(valor_original)).quantize(CENTS, rounding=ROUND_HALF_UP)
+    key = "\x1f".join(
+        [
+            str(cliente).strip().casefold(),
+            str(data_vencimento),
+            str(valor),
+            str(descricao).strip().casefold(),
+            str(origem).strip().casefold(),
+        ]
+    )
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=FINGERPRINT_BYTES).digest()
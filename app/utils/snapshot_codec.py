@@ -0,0 +1,76 @@
+import base64
+import json
+import zlib
+from typing import Any
+
+ENCODING_JSON = "json"
+ENCODING_COLUMNAR = "columnar"
+ENCODING_COLUMNAR_ZLIB = "columnar+zlib"
+ENCODINGS = (ENCODING_JSON, ENCODING_COLUMNAR, ENCODING_COLUMNAR_ZLIB)
+
+DICTIONARY_COLUMNS = ("cliente", "vendedor", "origem", "situacao")
+
+
+class SnapshotDecodeError(Exception):
+    pass
+
+
+def _columnar(rows: list[dict[str, Any]]) -> dict[str, Any]:
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    dictionaries = {}
+    data = {}
+    for column in columns:
+        values = [row.get(column) for row in rows]
+        if column in DICTIONARY_COLUMNS:
+            index: dict[Any, int] = {}
+            data[column] = [index.setdefault(value, len(index)) for value in values]
+            dictionaries[column] = list(index)
+        else:
+            data[column] = values
+    return {"rows": len(rows), "columns": columns, "dictionaries": dictionaries, "data": data}
+
+
+def encode_rows(rows: list[dict[str, Any]], encoding: str = ENCODING_COLUMNAR) -> Any:
+    if encoding == ENCODING_JSON:
+        return rows
+    payload = _columnar(rows)
+    if encoding == ENCODING_COLUMNAR:
+        return {"encoding": ENCODING_COLUMNAR, **payload}
+    if encoding == ENCODING_COLUMNAR_ZLIB:
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return {
+            "encoding": ENCODING_COLUMNAR_ZLIB,
+            "rows": payload["rows"],
+            "payload": base64.b64encode(zlib.compress(raw)).decode("ascii"),
+        }
+    raise ValueError(f"Codificação de snapshot desconhecida: {encoding}")
+
+
+def decode_rows(value: Any) -> list[dict[str, Any]]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    encoding = value.get("encoding")
+    if encoding == ENCODING_COLUMNAR_ZLIB:
+        value = json.loads(zlib.decompress(base64.b64decode(value["payload"])))
+    elif encoding != ENCODING_COLUMNAR:
+        raise SnapshotDecodeError(f"Codificação de snapshot desconhecida: {encoding}")
+    columns = value["columns"]
+    dictionaries = value["dictionaries"]
+    series = []
+    for column in columns:
+        values = value["data"][column]
+        if column in dictionaries:
+            dictionary = dictionaries[column]
+            values = [dictionary[code] for code in values]
+        series.append(values)
+    return [dict(zip(columns, row)) for row in zip(*series)]
+
+
+def row_count(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, list):
+        return len(value)
+    return value["rows"]
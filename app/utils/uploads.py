@@ -0,0 +1,32 @@
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_checksum(file: BinaryIO) -> str:
+    digest = hashlib.sha256()
+    position = file.tell()
+    while chunk := file.read(CHUNK_SIZE):
+        digest.update(chunk)
+    file.seek(position)
+    return digest.hexdigest()
+
+
+def store_upload(file: BinaryIO, filename: str) -> tuple[str, str]:
+    os.makedirs(settings.import_storage_dir, exist_ok=True)
+    _, extension = os.path.splitext(filename)
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(
+        dir=settings.import_storage_dir, suffix=extension, delete=False
+    ) as stored:
+        while chunk := file.read(CHUNK_SIZE):
+            digest.update(chunk)
+            stored.write(chunk)
+    return stored.name, digest.hexdigest()
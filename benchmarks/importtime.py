@@ -0,0 +1,107 @@
+"""Cold import time of the API module, as paid by every new uvicorn worker.
+
+    python -m benchmarks.importtime --repeat 5 --budget-ms 1500
+
+Each sample runs `python -X importtime -c "import app.main"` in a fresh interpreter. Exits
+with status 1 when the median is above --budget-ms, when a module that must stay out of
+the web startup path (parsers' pandas/openpyxl, migrations) was imported, or when importing
+the module and running the app's startup/shutdown events opened a database connection.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+MODULE = "app.main"
+FORBIDDEN = ["pandas", "openpyxl", "app.core.migrations"]
+STARTUP_SCRIPT = """
+import asyncio
+import importlib
+
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+connections = []
+event.listen(Pool, "connect", lambda *args: connections.append(1))
+try:
+    app = importlib.import_module({module!r}).app
+    asyncio.run(app.router.startup())
+    asyncio.run(app.router.shutdown())
+finally:
+    print(len(connections))
+"""
+
+
+def _import_times(module: str) -> dict[str, tuple[int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def _startup_connections(module: str) -> int:
+    # Um SQLite descartável: conta conexões sem depender de um banco no ar.
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp}/startup.db"}
+        env.pop("ASYNC_DATABASE_URL", None)
+        result = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT.format(module=module)],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+    # Uma subida que tentou usar o banco vazio e falhou também conta a conexão aberta.
+    return int(result.stdout.split()[-1])
+
+
+def measure(module: str = MODULE, repeat: int = 5, top: int = 10) -> dict:
+    _import_times(module)
+    samples = [_import_times(module) for _ in range(repeat)]
+    last = samples[-1]
+    slowest = sorted(last.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {
+        "module": module,
+        "import_ms": round(statistics.median(s[module][1] for s in samples) / 1000, 1),
+        "modules": len(last),
+        "forbidden": [name for name in FORBIDDEN if name in last],
+        "startup_connections": _startup_connections(module),
+        "slowest_self_ms": {name: round(self_us / 1000, 1) for name, (self_us, _) in slowest},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default=MODULE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float)
+    args = parser.parse_args()
+
+    result = measure(args.module, args.repeat, args.top)
+    print(json.dumps(result, indent=2))
+    if result["forbidden"]:
+        sys.exit(f"Importados na subida da API: {', '.join(result['forbidden'])}")
+    if result["startup_connections"]:
+        sys.exit(f"Conexões com o banco abertas na subida da API: {result['startup_connections']}")
+    if args.budget_ms and result["import_ms"] > args.budget_ms:
+        sys.exit(
+            f"Import de {args.module} levou {result['import_ms']} ms "
+            f"(limite {args.budget_ms} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Login storm against a running API: login latency and the latency of a cheap
+endpoint served at the same time.
+
+    python -m benchmarks.login_storm --base-url http://localhost:8000 \\
+        --username admin --password secret --logins 200 --concurrency 50
+"""
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _request(url: str, body: dict | None = None) -> tuple[int, float]:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        status = exc.code
+    return status, time.perf_counter() - started
+
+
+def _percentiles(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def at(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 1)
+
+    return {"count": len(ordered), "p50_ms": at(0.5), "p99_ms": at(0.99), "max_ms": at(1.0)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--probe-path", default="/health")
+    args = parser.parse_args()
+
+    body = {"username": args.username, "password": args.password}
+    with ThreadPoolExecutor(max_workers=args.concurrency + 1) as pool:
+        logins = [
+            pool.submit(_request, f"{args.base_url}/auth/login", body) for _ in range(args.logins)
+        ]
+        probes = []
+        while not all(future.done() for future in logins):
+            probes.append(_request(f"{args.base_url}{args.probe_path}"))
+        results = [future.result() for future in logins]
+
+    statuses: dict[int, int] = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    print(
+        json.dumps(
+            {
+                "login": _percentiles([elapsed for status, elapsed in results if status == 200]),
+                "login_statuses": statuses,
+                "probe": _percentiles([elapsed for _, elapsed in probes]),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Storage size and encode/decode time of each snapshot encoding.
+
+    python -m benchmarks.snapshot_encoding --rows 1000 100000
+
+`zlib_bytes` approximates what TOAST keeps on disk after its own compression.
+"""
+import argparse
+import json
+import time
+import zlib
+
+from app.utils.snapshot_codec import ENCODINGS, decode_rows, encode_rows
+from benchmarks.synthetic import synthetic_rows
+
+
+def snapshot_rows(rows: int) -> list[dict]:
+    return [
+        {
+            "invoice_id": invoice_id,
+            "cliente": cliente,
+            "data_vencimento": str(data_vencimento),
+            "descricao": descricao,
+            "valor_original": valor_original,
+            "vendedor": vendedor,
+            "origem": "ITAU",
+        }
+        for invoice_id, (cliente, data_vencimento, descricao, valor_original, vendedor) in (
+            enumerate(synthetic_rows(rows), start=1)
+        )
+    ]
+
+
+def measure(rows: list[dict], encoding: str) -> dict:
+    started = time.perf_counter()
+    encoded = encode_rows(rows, encoding)
+    serialized = json.dumps(encoded, separators=(",", ":")).encode("utf-8")
+    encode_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    decoded = decode_rows(json.loads(serialized))
+    decode_seconds = time.perf_counter() - started
+    assert decoded == rows
+
+    return {
+        "encoding": encoding,
+        "rows": len(rows),
+        "json_bytes": len(serialized),
+        "zlib_bytes": len(zlib.compress(serialized)),
+        "encode_ms": round(encode_seconds * 1000, 2),
+        "decode_ms": round(decode_seconds * 1000, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    args = parser.parse_args()
+    for count in args.rows:
+        rows = snapshot_rows(count)
+        for encoding in ENCODINGS:
+            print(json.dumps(measure(rows, encoding)))
+
+
+if __name__ == "__main__":
+    main()
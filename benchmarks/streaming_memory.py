@@ -0,0 +1,73 @@
+"""Peak RSS of the streaming parser versus the in-memory parser.
+
+    python -m benchmarks.streaming_memory --rows 10000 100000 1000000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import write_workbook
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _worker(mode: str, path: str) -> None:
+    from app.utils.excel_parsers import iter_itau, parse_itau
+
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    rows = 0
+    if mode == "streaming":
+        with open(path, "rb") as handle:
+            for chunk, invalid in iter_itau(handle, path):
+                rows += len(chunk) + invalid
+    else:
+        with open(path, "rb") as handle:
+            valid, invalid = parse_itau(handle.read())
+        rows = len(valid) + invalid
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "rows": rows,
+                "seconds": round(time.perf_counter() - started, 3),
+                "baseline_rss_mb": round(baseline, 1),
+                "peak_rss_mb": round(_peak_rss_mb(), 1),
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--modes", nargs="+", default=["streaming", "in-memory"])
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(*args.worker)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = write_workbook(Path(tmp) / f"itau_{rows}.xlsx", "itau", rows)
+            for mode in args.modes:
+                result = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.streaming_memory", "--worker", mode, str(path)],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                print(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""End-to-end throughput and latency on synthetic Itaú/Conta Azul workbooks.
+
+    python -m benchmarks.suite --rows 50000 --output results.json
+    python -m benchmarks.suite --rows 50000 --compare baseline.json
+
+Runs against a throwaway SQLite file unless --database-url is given; a
+PostgreSQL database must be empty or passed with --reset (drops every table).
+--compare exits with status 1 when a metric got worse by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.synthetic import alias_header, write_workbook
+
+SOURCES = {"itau": "ITAU", "conta-azul": "CONTA_AZUL"}
+REPORT_TYPES = ["vencidos", "totais_por_vendedor", "aging"]
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metric(value: float, unit: str, better: str) -> dict:
+    return {"value": round(value, 3), "unit": unit, "better": better}
+
+
+def _timed(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _prepare_database(reset: bool) -> None:
+    from sqlalchemy import func, inspect, select, text
+
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.migrations import upgrade
+    from app.models import Invoice
+
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS schema_migrations"))
+    upgrade()
+    if not reset and inspect(engine).has_table("invoices"):
+        with SessionLocal() as db:
+            if db.execute(select(func.count()).select_from(Invoice)).scalar():
+                sys.exit("O banco de benchmark precisa estar vazio (use --reset).")
+
+
+def bench_parse(files: dict[str, Path], repeat: int) -> dict:
+    from app.services.invoice_service import PARSERS
+
+    metrics = {}
+    for source, path in files.items():
+        counts = {}
+
+        def parse():
+            valid = invalid = 0
+            with open(path, "rb") as handle:
+                for rows, skipped in PARSERS[SOURCES[source]](handle, path.name):
+                    valid += len(rows)
+                    invalid += skipped
+            counts.update(valid=valid, invalid=invalid)
+
+        seconds = statistics.median(_timed(parse, repeat)) / 1000
+        total = counts["valid"] + counts["invalid"]
+        metrics[f"parse.{source}.rows_per_s"] = _metric(total / seconds, "rows/s", "higher")
+        metrics[f"parse.{source}.invalid_rows"] = _metric(counts["invalid"], "rows", "exact")
+    return metrics
+
+
+def bench_ingest(files: dict[str, Path]) -> dict:
+    from sqlalchemy import text
+
+    from app.core.database import SessionLocal
+    from app.services import invoice_service
+
+    metrics = {}
+    with SessionLocal() as db:
+        for label in ("first", "reimport"):
+            for source, path in files.items():
+                with open(path, "rb") as handle:
+                    started = time.perf_counter()
+                    inserted, invalid, duplicates, file_duplicates = invoice_service.upload(
+                        db, SOURCES[source], handle, path.name
+                    )
+                    seconds = time.perf_counter() - started
+                total = inserted + invalid + duplicates + file_duplicates
+                prefix = f"ingest.{source}.{label}"
+                metrics[f"{prefix}.rows_per_s"] = _metric(total / seconds, "rows/s", "higher")
+                metrics[f"{prefix}.inserted"] = _metric(inserted, "rows", "exact")
+                metrics[f"{prefix}.duplicates"] = _metric(duplicates, "rows", "exact")
+                metrics[f"{prefix}.file_duplicates"] = _metric(file_duplicates, "rows", "exact")
+        if db.get_bind().dialect.name == "postgresql":
+            index_bytes = db.execute(text("SELECT pg_indexes_size('invoices')")).scalar()
+            metrics["storage.invoices.index_bytes"] = _metric(index_bytes, "bytes", "lower")
+    return metrics
+
+
+def bench_reupload(files: dict[str, Path], repeat: int) -> dict:
+    from app.core.database import SessionLocal
+    from app.services import import_service
+
+    metrics = {}
+    with SessionLocal() as db:
+        for source, path in files.items():
+            with open(path, "rb") as handle:
+                import_service.upload_file(db, SOURCES[source], handle, path.name, None)
+
+                def reupload():
+                    handle.seek(0)
+                    import_service.upload_file(db, SOURCES[source], handle, path.name, None)
+
+                metrics[f"ingest.{source}.identical_reupload.p50_ms"] = _metric(
+                    statistics.median(_timed(reupload, repeat)), "ms", "lower"
+                )
+    return metrics
+
+
+def bench_snapshots(repeat: int) -> dict:
+    from app.core.database import SessionLocal
+    from app.services import report_service
+
+    metrics = {}
+    with SessionLocal() as db:
+        for report_type in REPORT_TYPES:
+
+            def build():
+                report_service.create_snapshot(db, report_type, "DIRETORIA", "EXPORT", None)
+
+            samples = _timed(build, repeat)
+            metrics[f"snapshot.{report_type}.first_ms"] = _metric(samples[0], "ms", "lower")
+            metrics[f"snapshot.{report_type}.p50_ms"] = _metric(
+                statistics.median(samples), "ms", "lower"
+            )
+
+        def delta():
+            report_service.create_snapshot(
+                db, "vencidos", "DIRETORIA", "EXPORT", None, mode=report_service.MODE_DELTA
+            )
+
+        metrics["snapshot.vencidos_delta.p50_ms"] = _metric(
+            statistics.median(_timed(delta, repeat)), "ms", "lower"
+        )
+    return metrics
+
+
+def bench_history(history_rows: int, page_size: int, pages: int, repeat: int) -> dict:
+    from app.core.database import SessionLocal
+    from app.models import ReportSnapshot, SendHistory
+    from app.services import report_service
+
+    with SessionLocal() as db:
+        snapshot_id = db.query(ReportSnapshot.id).limit(1).scalar()
+        sent_at = datetime.utcnow()
+        db.bulk_insert_mappings(
+            SendHistory,
+            [
+                {
+                    "recipient_type": "VENDEDOR",
+                    "recipient_value": f"Vendedor {index % 200:03d}",
+                    "report_type": "vencidos",
+                    "method": "EXPORT" if index % 3 else "WHATSAPP",
+                    "sent_at": sent_at - timedelta(seconds=index),
+                    "snapshot_id": snapshot_id,
+                }
+                for index in range(history_rows)
+            ],
+        )
+        db.commit()
+
+        def first_page():
+            report_service.list_history(db, page_size)
+
+        def walk():
+            cursor = None
+            for _ in range(pages):
+                _, cursor = report_service.list_history(db, page_size, cursor)
+                if cursor is None:
+                    break
+
+        def filtered():
+            report_service.list_history(db, page_size, method="WHATSAPP")
+
+        return {
+            "history.first_page.p50_ms": _metric(
+                statistics.median(_timed(first_page, repeat)), "ms", "lower"
+            ),
+            f"history.walk_{pages}_pages.p50_ms": _metric(
+                statistics.median(_timed(walk, repeat)), "ms", "lower"
+            ),
+            "history.filtered_page.p50_ms": _metric(
+                statistics.median(_timed(filtered, repeat)), "ms", "lower"
+            ),
+        }
+
+
+def bench_startup(repeat: int) -> dict:
+    from benchmarks.importtime import measure
+
+    result = measure(repeat=repeat)
+    return {
+        "startup.import_ms": _metric(result["import_ms"], "ms", "lower"),
+        "startup.modules": _metric(result["modules"], "modules", "lower"),
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, metric in current["metrics"].items():
+        previous = baseline["metrics"].get(name)
+        if not previous or not previous["value"]:
+            continue
+        change = (metric["value"] - previous["value"]) / previous["value"]
+        if metric["better"] == "exact":
+            worse = metric["value"] != previous["value"]
+        elif metric["better"] == "higher":
+            worse = change < -tolerance
+        else:
+            worse = change > tolerance
+        flag = "REGRESSAO" if worse else ""
+        print(f"{name:45} {previous['value']:>14} -> {metric['value']:>14} {change:+8.1%} {flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.05)
+    parser.add_argument("--invalid-ratio", type=float, default=0.05)
+    parser.add_argument("--history-rows", type=int, default=10_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url")
+    parser.add_argument("--reset", action="store_true")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{workdir / 'bench.db'}"
+        _prepare_database(args.reset or not args.database_url)
+
+        files = {
+            source: write_workbook(
+                workdir / f"{source}.xlsx",
+                source,
+                args.rows,
+                seed=args.seed + index,
+                duplicate_ratio=args.duplicate_ratio,
+                invalid_ratio=args.invalid_ratio,
+                header=alias_header(source, args.seed + index),
+            )
+            for index, source in enumerate(SOURCES)
+        }
+
+        from app.core.database import engine
+
+        results = {
+            "meta": {
+                "commit": _commit(),
+                "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "database": engine.dialect.name,
+                "rows": args.rows,
+                "seed": args.seed,
+                "duplicate_ratio": args.duplicate_ratio,
+                "invalid_ratio": args.invalid_ratio,
+                "history_rows": args.history_rows,
+            },
+            "metrics": {},
+        }
+        results["metrics"].update(bench_parse(files, args.repeat))
+        results["metrics"].update(bench_ingest(files))
+        results["metrics"].update(bench_reupload(files, args.repeat))
+        results["metrics"].update(bench_snapshots(args.repeat))
+        results["metrics"].update(
+            bench_history(args.history_rows, args.page_size, args.pages, args.repeat)
+        )
+        engine.dispose()
+        results["metrics"].update(bench_startup(args.repeat))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        if regressions:
+            sys.exit(f"Regressões acima de {args.tolerance:.0%}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
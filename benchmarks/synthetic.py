@@ -0,0 +1,83 @@
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+from openpyxl import Workbook
+
+from app.utils.excel_parsers import CONTA_AZUL_COLUMNS, ITAU_COLUMNS
+
+ITAU_HEADER = ["Sacado", "Vencimento", "Historico", "Valor", "Carteira"]
+CONTA_AZUL_HEADER = ["Razao Social", "Data de Vencimento", "Observacao", "Valor Original", "Vendedor"]
+
+HEADERS = {"itau": ITAU_HEADER, "conta-azul": CONTA_AZUL_HEADER}
+COLUMN_ALIASES = {"itau": ITAU_COLUMNS, "conta-azul": CONTA_AZUL_COLUMNS}
+FIELDS = ["cliente", "data_vencimento", "descricao", "valor_original", "vendedor"]
+
+
+def alias_header(source: str, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    return [rng.choice(COLUMN_ALIASES[source][field]).title() for field in FIELDS]
+
+
+def _invalidate(row: list, rng: random.Random, today: date) -> list:
+    kind = rng.randrange(4)
+    if kind == 0:
+        row[0] = None
+    elif kind == 1:
+        row[1] = today + timedelta(days=rng.randint(0, 60))
+    elif kind == 2:
+        row[3] = -row[3]
+    else:
+        row[4] = "   "
+    return row
+
+
+def synthetic_rows(
+    rows: int,
+    seed: int = 42,
+    today: date | None = None,
+    duplicate_ratio: float = 0.0,
+    invalid_ratio: float = 0.0,
+):
+    rng = random.Random(seed)
+    today = today or date.today()
+    previous = []
+    for index in range(rows):
+        if duplicate_ratio and previous and rng.random() < duplicate_ratio:
+            yield list(rng.choice(previous))
+            continue
+        row = [
+            f"Cliente {rng.randrange(rows // 10 + 1):06d}",
+            today - timedelta(days=rng.randint(1, 720)),
+            f"Parcela {index:08d}",
+            round(rng.uniform(10, 50_000), 2),
+            f"Vendedor {rng.randrange(200):03d}",
+        ]
+        if invalid_ratio and rng.random() < invalid_ratio:
+            yield _invalidate(row, rng, today)
+            continue
+        if len(previous) < 1000:
+            previous.append(row)
+        else:
+            previous[rng.randrange(len(previous))] = row
+        yield row
+
+
+def write_workbook(
+    path: Path,
+    source: str,
+    rows: int,
+    seed: int = 42,
+    duplicate_ratio: float = 0.0,
+    invalid_ratio: float = 0.0,
+    header: list[str] | None = None,
+) -> Path:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header or HEADERS[source])
+    for row in synthetic_rows(
+        rows, seed, duplicate_ratio=duplicate_ratio, invalid_ratio=invalid_ratio
+    ):
+        sheet.append(row)
+    workbook.save(path)
+    return path
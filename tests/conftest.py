@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+import pytest
+
+# Precisa valer antes do primeiro import de app: engines e settings são criados no import.
+_tmpdir = tempfile.mkdtemp(prefix="cobranca-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/test.db"
+os.environ["DELIVERY_PROVIDER"] = "fake"
+os.environ["IMPORT_STORAGE_DIR"] = os.path.join(_tmpdir, "imports")
+
+from app.core import dimension_cache  # noqa: E402
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.migrations import upgrade  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    upgrade()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+        # Ids em cache apontariam para linhas apagadas acima.
+        for cache in (
+            dimension_cache.client_cache,
+            dimension_cache.vendor_cache,
+            dimension_cache.client_vendor_cache,
+            dimension_cache.invoice_fingerprint_cache,
+        ):
+            cache.clear()
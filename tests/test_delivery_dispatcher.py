@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.core.rate_limit import TokenBucket
+from app.models import DeliveryAttempt, DeliveryJob, ReportSnapshot, SendHistory
+from app.repositories import delivery_repository
+from app.services import delivery_service
+from app.services.delivery_providers import FakeWhatsAppProvider
+from app.utils.snapshot_codec import encode_rows
+
+ROWS = [{"invoice_id": 1, "cliente": "Empresa X", "valor_original": 10.0}]
+
+
+@pytest.fixture
+def job(db):
+    snapshot = ReportSnapshot(
+        report_type="vencidos",
+        recipient_type="VENDEDOR",
+        method="WHATSAPP",
+        data_json=encode_rows(ROWS),
+    )
+    db.add(snapshot)
+    db.flush()
+    job = DeliveryJob(
+        snapshot_id=snapshot.id,
+        recipient_type="VENDEDOR",
+        recipient_value="João",
+        destination="5511999990000",
+        provider=FakeWhatsAppProvider.name,
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def _dispatcher(provider: FakeWhatsAppProvider) -> delivery_service.DeliveryDispatcher:
+    return delivery_service.DeliveryDispatcher(provider, bucket=TokenBucket(1000, 1000))
+
+
+def _make_due(db, job: DeliveryJob) -> None:
+    job.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+
+def _claim(lease_until: datetime, now: datetime | None = None) -> list[DeliveryJob]:
+    async def claim():
+        async with AsyncSessionLocal() as session:
+            return await delivery_repository.claim_due_async(
+                session, FakeWhatsAppProvider.name, now or datetime.utcnow(), lease_until, 10
+            )
+
+    return asyncio.run(claim())
+
+
+def test_retryable_failure_is_rescheduled_then_sent(db, job):
+    provider = FakeWhatsAppProvider(failure_rate=1.0)
+    dispatcher = _dispatcher(provider)
+
+    assert asyncio.run(dispatcher.run_once()) == 1
+    db.refresh(job)
+    assert job.status == "PENDENTE"
+    assert job.attempts == 1
+    assert job.next_attempt_at > datetime.utcnow()
+    assert job.last_error == "Falha simulada do provedor."
+    assert db.query(SendHistory).count() == 0
+
+    # Antes do backoff vencer o job não é pego de novo.
+    assert asyncio.run(dispatcher.run_once()) == 0
+
+    _make_due(db, job)
+    provider.failure_rate = 0.0
+    assert asyncio.run(dispatcher.run_once()) == 1
+    db.refresh(job)
+    assert job.status == "ENVIADO"
+    assert job.attempts == 2
+    assert job.provider_message_id
+    assert job.last_error is None
+    assert [destination for destination, _ in provider.sent] == [job.destination]
+    attempts = db.query(DeliveryAttempt).order_by(DeliveryAttempt.attempt).all()
+    assert [(attempt.attempt, attempt.status) for attempt in attempts] == [
+        (1, "FALHA"),
+        (2, "ENVIADO"),
+    ]
+    history = db.query(SendHistory).one()
+    assert (history.snapshot_id, history.method) == (job.snapshot_id, "WHATSAPP")
+
+
+def test_gives_up_after_max_attempts(db, job, monkeypatch):
+    monkeypatch.setattr(delivery_service.settings, "delivery_max_attempts", 2)
+    dispatcher = _dispatcher(FakeWhatsAppProvider(failure_rate=1.0))
+
+    asyncio.run(dispatcher.run_once())
+    _make_due(db, job)
+    asyncio.run(dispatcher.run_once())
+    db.refresh(job)
+    assert (job.status, job.attempts) == ("ERRO", 2)
+
+    _make_due(db, job)
+    assert asyncio.run(dispatcher.run_once()) == 0
+
+
+def test_non_retryable_failure_is_final(db, job):
+    job.destination = "sem-numero"
+    db.commit()
+
+    assert asyncio.run(_dispatcher(FakeWhatsAppProvider()).run_once()) == 1
+    db.refresh(job)
+    assert (job.status, job.attempts) == ("ERRO", 1)
+    assert "Número inválido" in job.last_error
+
+
+def test_expired_lease_is_reclaimed(db, job):
+    now = datetime.utcnow()
+    lease_until = now + timedelta(minutes=5)
+
+    claimed = _claim(lease_until, now)
+    assert [claimed_job.id for claimed_job in claimed] == [job.id]
+    db.refresh(job)
+    assert (job.status, job.attempts, job.next_attempt_at) == ("ENVIANDO", 1, lease_until)
+
+    # Enquanto o prazo vale, outro worker não pega o mesmo job.
+    assert _claim(now + timedelta(minutes=10), now + timedelta(minutes=1)) == []
+
+    # O worker caiu sem registrar a tentativa: passado o prazo, o job volta para a fila.
+    later = lease_until + timedelta(seconds=1)
+    reclaimed = _claim(later + timedelta(minutes=5), later)
+    assert [claimed_job.id for claimed_job in reclaimed] == [job.id]
+    db.refresh(job)
+    assert (job.status, job.attempts) == ("ENVIANDO", 2)
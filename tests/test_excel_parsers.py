@@ -0,0 +1,128 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from io import BytesIO
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from app.utils.excel_parsers import ITAU_COLUMNS, _header_names, iter_itau, parse_itau
+
+TODAY = date.today()
+DUE = TODAY - timedelta(days=10)
+
+HEADER = [" Sacado ", "VENCIMENTO", "Historico", "Valor", "Carteira", "Valor", "Valor.1"]
+GOOD = ("Empresa X", DUE, "Mensalidade", 100, "João", 1, 2)
+
+
+def _old_parse(content: bytes, today: date) -> tuple[list[dict], int]:
+    """Caminho linha a linha de antes do parse vetorizado: parse_itau antigo + _is_valid."""
+    df = pd.read_excel(BytesIO(content))
+    columns = {col.lower().strip(): col for col in df.columns}
+    resolved = {
+        target: next(columns[c] for c in candidates if c in columns)
+        for target, candidates in ITAU_COLUMNS.items()
+    }
+    rows, invalid = [], 0
+    for _, record in df.iterrows():
+        row = {target: record[source] for target, source in resolved.items()}
+        row = {
+            "cliente": str(row["cliente"]).strip() if row["cliente"] is not None else "",
+            "data_vencimento": pd.to_datetime(row["data_vencimento"], errors="coerce").date()
+            if row["data_vencimento"] is not None
+            else None,
+            "descricao": str(row["descricao"]).strip() if row["descricao"] is not None else "",
+            "valor_original": Decimal(str(row["valor_original"]))
+            if row["valor_original"] is not None
+            else Decimal("0"),
+            "vendedor": str(row["vendedor"]).strip() if row["vendedor"] is not None else "",
+            "origem": "ITAU",
+        }
+        if (
+            not row["cliente"]
+            or not row["descricao"]
+            or not row["vendedor"]
+            or not row["data_vencimento"]
+            or row["data_vencimento"] >= today
+            or row["valor_original"] <= 0
+        ):
+            invalid += 1
+            continue
+        rows.append(row)
+    return rows, invalid
+
+
+def _xlsx(*rows: tuple) -> bytes:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER)
+    for row in rows:
+        sheet.append(list(row))
+    output = BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def _new_parses(content: bytes) -> list[tuple[list[dict], int]]:
+    # Mesmo arquivo pelos dois caminhos novos: pd.read_excel e leitura em blocos do openpyxl.
+    chunks = list(iter_itau(BytesIO(content), "itau.xlsx", chunk_size=2))
+    streamed = [row for rows, _ in chunks for row in rows], sum(n for _, n in chunks)
+    return [parse_itau(content, TODAY), streamed]
+
+
+def _without_fingerprint(rows: list[dict]) -> list[dict]:
+    return [{k: v for k, v in row.items() if k != "dedup_fingerprint"} for row in rows]
+
+
+def test_header_names_match_read_excel():
+    content = _xlsx(GOOD)
+    header = next(iter(pd.read_excel(BytesIO(content), header=None).itertuples(index=False)))
+    assert _header_names(tuple(header)) == list(pd.read_excel(BytesIO(content)).columns)
+
+
+def test_vectorized_parse_matches_row_by_row_parse():
+    content = _xlsx(
+        GOOD,
+        ("  Empresa Y  ", DUE, " Consultoria ", 250.5, " Maria ", 0, 0),
+        ("Empresa Y", datetime.combine(DUE, time(15, 30)), "Com hora", 10, "Maria", 0, 0),
+        ("Empresa Z", DUE.isoformat(), "Data em texto", "30.75", "Ana", 0, 0),
+        ("Empresa Z", DUE, "Valor zero", 0, "Ana", 5, 5),
+        ("Empresa Z", DUE, "Valor negativo", -10, "Ana", 5, 5),
+        ("Empresa Z", TODAY, "Vence hoje", 10, "Ana", 5, 5),
+        ("Empresa Z", TODAY + timedelta(days=1), "A vencer", 10, "Ana", 5, 5),
+        ("   ", DUE, "Cliente em branco", 10, "Ana", 5, 5),
+    )
+    expected_rows, expected_invalid = _old_parse(content, TODAY)
+    assert len(expected_rows) == 4 and expected_invalid == 5
+
+    for rows, invalid in _new_parses(content):
+        assert (_without_fingerprint(rows), invalid) == (expected_rows, expected_invalid)
+
+
+@pytest.mark.parametrize(
+    "row",
+    [
+        (None, DUE, "Mensalidade", 100, "João", 1, 2),
+        ("Empresa X", None, "Mensalidade", 100, "João", 1, 2),
+        ("Empresa X", "31/02/2024", "Mensalidade", 100, "João", 1, 2),
+        ("Empresa X", DUE, None, 100, "João", 1, 2),
+        ("Empresa X", DUE, "Mensalidade", None, "João", 1, 2),
+        ("Empresa X", DUE, "Mensalidade", "abc", "João", 1, 2),
+        ("Empresa X", DUE, "Mensalidade", 100, None, 1, 2),
+    ],
+)
+def test_empty_and_unparseable_cells_are_rejected(row):
+    content = _xlsx(GOOD, row)
+    good_rows, _ = _old_parse(_xlsx(GOOD), TODAY)
+
+    # Única diferença intencional: a célula vira NaN/NaT e a linha é recusada. Antes ela entrava
+    # como o texto "nan" ou derrubava a importação inteira.
+    try:
+        old_rows, old_invalid = _old_parse(content, TODAY)
+    except (TypeError, InvalidOperation):
+        pass
+    else:
+        assert old_invalid == 0 and "nan" in old_rows[1].values()
+
+    for rows, invalid in _new_parses(content):
+        assert (_without_fingerprint(rows), invalid) == (good_rows, 1)
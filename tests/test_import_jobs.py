@@ -0,0 +1,71 @@
+import time
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
+from io import BytesIO
+
+from openpyxl import Workbook
+
+from app.models import ImportBatch
+from app.services import import_service
+
+
+class QueuedPool:
+    """Pool que só guarda as tarefas: o job fica na fila até o teste executá-lo."""
+
+    def __init__(self):
+        self.submitted: list[tuple[Future, tuple]] = []
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        self.submitted.append((future, (fn, *args)))
+        return future
+
+    def run_next(self) -> None:
+        future, (fn, *args) = self.submitted.pop(0)
+        future.set_result(fn(*args))
+
+
+def _itau_xlsx() -> bytes:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Sacado", "Vencimento", "Historico", "Valor", "Carteira"])
+    sheet.append(["Empresa X", date.today() - timedelta(days=5), "Mensalidade", 100, "João"])
+    output = BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def test_queued_job_outlives_stale_window(db, monkeypatch):
+    monkeypatch.setattr(import_service.settings, "import_stale_seconds", 0.3)
+    pool = QueuedPool()
+    monkeypatch.setattr(import_service, "get_process_pool", lambda: pool)
+
+    batch, reused = import_service.enqueue_import(
+        db, "ITAU", BytesIO(_itau_xlsx()), "itau.xlsx", None
+    )
+    assert not reused
+    time.sleep(1)
+
+    # Na fila há mais que o prazo, mas o processo que o recebeu continua renovando o job.
+    assert import_service.sweep_stale_imports(db) == (0, 0)
+    db.refresh(batch)
+    assert batch.status == "PENDENTE"
+
+    pool.run_next()
+    db.refresh(batch)
+    assert (batch.status, batch.inserted_rows, batch.error) == ("CONCLUIDO", 1, None)
+    assert batch.id not in import_service._queued
+
+
+def test_orphaned_queued_job_is_failed(db):
+    # Job PENDENTE de um processo que morreu: ninguém renova updated_at.
+    batch = ImportBatch(source_system="ITAU", file_name="itau.xlsx", file_checksum="x")
+    db.add(batch)
+    db.commit()
+    stale = datetime.utcnow() - timedelta(seconds=import_service.settings.import_stale_seconds + 1)
+    db.query(ImportBatch).update({"updated_at": stale, "imported_at": stale})
+    db.commit()
+
+    assert import_service.sweep_stale_imports(db) == (1, 0)
+    db.refresh(batch)
+    assert (batch.status, batch.error) == ("ERRO", import_service.STALE_ERROR)
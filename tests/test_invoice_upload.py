@@ -0,0 +1,115 @@
+import os
+from datetime import date, timedelta
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook
+
+from app.core.dimension_cache import invoice_fingerprint_cache
+from app.models import Client, ClientVendor, Invoice, OverdueInvoice, Vendor
+from app.services import invoice_service
+
+TODAY = date.today()
+DUE = TODAY - timedelta(days=10)
+
+
+def _itau_xlsx(*rows: tuple) -> BytesIO:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Sacado", "Vencimento", "Historico", "Valor", "Carteira"])
+    for row in rows:
+        sheet.append(list(row))
+    output = BytesIO()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def test_rows_before_retention_cutoff_are_rejected(db, monkeypatch):
+    cutoff = TODAY - timedelta(days=60)
+    monkeypatch.setattr(invoice_service, "retention_cutoff", lambda bind: cutoff)
+    file = _itau_xlsx(
+        ("Empresa X", cutoff - timedelta(days=1), "Arquivada", 100, "João"),
+        ("Empresa X", cutoff, "Retida", 200, "João"),
+    )
+
+    assert invoice_service.upload_itau(db, file, "itau.xlsx") == (1, 1, 0, 0)
+    assert [invoice.descricao for invoice in db.query(Invoice)] == ["Retida"]
+
+
+@pytest.mark.parametrize("fingerprint_cache_size", [0, 100])
+def test_same_file_twice_is_skipped(db, monkeypatch, fingerprint_cache_size):
+    monkeypatch.setattr(invoice_fingerprint_cache, "max_size", fingerprint_cache_size)
+    rows = [
+        ("Empresa X", DUE, "Janeiro", 100, "João"),
+        ("Empresa X", DUE, "Janeiro", 100, "João"),
+        ("Empresa Y", DUE, "Janeiro", 50, "Maria"),
+        ("Empresa Y", TODAY, "A vencer", 50, "Maria"),
+    ]
+
+    assert invoice_service.upload_itau(db, _itau_xlsx(*rows), "itau.xlsx") == (2, 1, 0, 1)
+    assert invoice_service.upload_itau(db, _itau_xlsx(*rows), "itau.xlsx") == (0, 1, 2, 1)
+    assert db.query(Invoice).count() == db.query(OverdueInvoice).count() == 2
+
+
+def test_batch_dedups_across_files(db):
+    first = _itau_xlsx(
+        ("Empresa X", DUE, "Janeiro", 100, "João"),
+        ("Empresa Y", DUE, "Janeiro", 50, "Maria"),
+    )
+    second = _itau_xlsx(
+        ("Empresa Y", DUE, "Janeiro", 50, "Maria"),
+        ("Empresa Z", DUE, "Janeiro", 70, "Maria"),
+    )
+
+    results = invoice_service.upload_batch(
+        db, [("ITAU", first, "a.xlsx"), ("ITAU", second, "b.xlsx")]
+    )
+    assert results == [
+        ("a.xlsx", "ITAU", (2, 0, 0, 0), None),
+        ("b.xlsx", "ITAU", (1, 0, 0, 1), None),
+    ]
+    assert db.query(Invoice).count() == 3
+
+
+def test_dimensions_are_upserted(db):
+    existing = Client(legal_name="Empresa X")
+    db.add(existing)
+    db.commit()
+    file = _itau_xlsx(
+        ("Empresa X", DUE, "Janeiro", 100, "João"),
+        ("Empresa X", DUE, "Fevereiro", 100, "Maria"),
+        ("Empresa Y", DUE, "Janeiro", 50, "Maria"),
+    )
+
+    assert invoice_service.upload_itau(db, file, "itau.xlsx") == (3, 0, 0, 0)
+    clients = dict(db.query(Client.legal_name, Client.id))
+    vendors = dict(db.query(Vendor.name, Vendor.id))
+    assert clients["Empresa X"] == existing.id and set(clients) == {"Empresa X", "Empresa Y"}
+    assert set(vendors) == {"João", "Maria"}
+    assert set(db.query(ClientVendor.client_id, ClientVendor.vendor_id)) == {
+        (clients["Empresa X"], vendors["João"]),
+        (clients["Empresa X"], vendors["Maria"]),
+        (clients["Empresa Y"], vendors["Maria"]),
+    }
+    assert {(invoice.client_id, invoice.vendor_id) for invoice in db.query(Invoice)} == set(
+        db.query(ClientVendor.client_id, ClientVendor.vendor_id)
+    )
+
+
+def test_batch_removes_stored_files_when_storing_fails(db, monkeypatch):
+    original = invoice_service.store_upload
+    stored = []
+
+    def store_upload(file, filename):
+        if stored:
+            raise OSError("disco cheio")
+        stored.append(original(file, filename)[0])
+        return stored[-1], ""
+
+    monkeypatch.setattr(invoice_service, "store_upload", store_upload)
+    file = _itau_xlsx(("Empresa X", DUE, "Janeiro", 100, "João"))
+
+    with pytest.raises(OSError):
+        invoice_service.upload_batch(db, [("ITAU", file, "a.xlsx"), ("ITAU", file, "b.xlsx")])
+    assert len(stored) == 1 and not os.path.exists(stored[0])
@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+from app.core.rate_limit import TokenBucket
+
+
+def _elapsed(coro) -> float:
+    started = time.monotonic()
+    asyncio.run(coro)
+    return time.monotonic() - started
+
+
+def test_burst_is_immediate():
+    async def burst():
+        bucket = TokenBucket(rate=10, capacity=5)
+        for _ in range(5):
+            await bucket.acquire()
+
+    assert _elapsed(burst()) < 0.05
+
+
+def test_paces_to_rate_after_burst():
+    async def drain():
+        bucket = TokenBucket(rate=50, capacity=5)
+        for _ in range(15):
+            await bucket.acquire()
+
+    # 5 fichas do burst saem na hora; as outras 10 a 50/s levam 0,2 s.
+    assert 0.18 <= _elapsed(drain()) < 0.35
+
+
+def test_concurrent_waiters_share_the_rate():
+    async def concurrent():
+        bucket = TokenBucket(rate=50, capacity=1)
+        order = []
+
+        async def take(index: int) -> None:
+            await bucket.acquire()
+            order.append(index)
+
+        await asyncio.gather(*(take(index) for index in range(11)))
+        return order
+
+    started = time.monotonic()
+    order = asyncio.run(concurrent())
+    assert 0.18 <= time.monotonic() - started < 0.35
+    assert order == list(range(11))
@@ -0,0 +1,127 @@
+from app.models import ReportSnapshot, SendHistory
+from app.services.report_service import (
+    DELTA_ADDED,
+    DELTA_CHANGED,
+    DELTA_COLUMN,
+    DELTA_RESOLVED,
+    MODE_DELTA,
+    _delta_base,
+    _diff_rows,
+    rebuild_rows,
+)
+from app.utils.snapshot_codec import ENCODING_COLUMNAR_ZLIB, decode_rows, encode_rows
+
+FILTERS = {"only_overdue": True, "vendedor": "João"}
+
+
+def _row(invoice_id: int, valor: float = 10.0, vendedor: str = "João") -> dict:
+    return {
+        "invoice_id": invoice_id,
+        "cliente": "Empresa X",
+        "data_vencimento": "2026-01-10",
+        "descricao": "Mensalidade",
+        "valor_original": valor,
+        "vendedor": vendedor,
+        "origem": "ITAU",
+    }
+
+
+def _by_id(rows: list[dict]) -> list[dict]:
+    return sorted(rows, key=lambda row: row["invoice_id"])
+
+
+def _legacy(row: dict) -> dict:
+    return {key: value for key, value in row.items() if key != "invoice_id"}
+
+
+def _snapshot(db, rows: list[dict], base: ReportSnapshot | None = None) -> ReportSnapshot:
+    snapshot = ReportSnapshot(
+        report_type="vencidos",
+        recipient_type="VENDEDOR",
+        method="WHATSAPP",
+        filters_json=FILTERS,
+        data_json=encode_rows(rows, ENCODING_COLUMNAR_ZLIB),
+        mode=MODE_DELTA if base else "full",
+        base_snapshot_id=base.id if base else None,
+    )
+    db.add(snapshot)
+    db.commit()
+    return snapshot
+
+
+def test_diff_marks_added_changed_and_resolved():
+    base = [_row(1), _row(2), _row(3)]
+    rows = [_row(1), _row(2, valor=12.5), _row(4)]
+
+    delta = {row["invoice_id"]: row[DELTA_COLUMN] for row in _diff_rows(base, rows)}
+
+    assert delta == {2: DELTA_CHANGED, 3: DELTA_RESOLVED, 4: DELTA_ADDED}
+
+
+def test_rows_with_identical_content_stay_distinct():
+    # Mesmo conteúdo em títulos diferentes: cada um é uma linha.
+    base = [_row(1), _row(2)]
+    rows = [_row(1), _row(2), _row(3)]
+
+    delta = _diff_rows(base, rows)
+
+    assert [(row["invoice_id"], row[DELTA_COLUMN]) for row in delta] == [(3, DELTA_ADDED)]
+
+
+def test_rebuild_rows_round_trips_a_delta_chain(db):
+    full = [_row(1), _row(2), _row(3, vendedor="Maria")]
+    second = [_row(1), _row(2, valor=20.0), _row(3, vendedor="Maria"), _row(4), _row(5)]
+    third = [_row(2, valor=20.0), _row(4), _row(5), _row(6)]
+
+    base = _snapshot(db, full)
+    middle = _snapshot(db, _diff_rows(full, second), base)
+    last = _snapshot(db, _diff_rows(second, third), middle)
+
+    assert _by_id(rebuild_rows(db, base)) == full
+    assert _by_id(rebuild_rows(db, middle)) == second
+    assert _by_id(rebuild_rows(db, last)) == third
+
+
+def test_rebuild_rows_keeps_content_keys_for_legacy_snapshots(db):
+    legacy = [_legacy(_row(0))]
+    rows = legacy + [{**legacy[0], "descricao": "Outra"}]
+
+    base = _snapshot(db, legacy)
+    delta = _snapshot(db, _diff_rows(legacy, rows), base)
+
+    assert rebuild_rows(db, delta) == rows
+
+
+def test_rebuild_rows_replaces_legacy_base_rows(db):
+    # A base antiga não tem invoice_id; decodificada, a coluna volta como None.
+    legacy = [_legacy(_row(0)), _legacy(_row(0, valor=5.0))]
+    rows = [_row(1), _row(2, valor=5.0)]
+    base = _snapshot(db, legacy)
+    base_rows = decode_rows(base.data_json)
+
+    delta = _snapshot(db, _diff_rows(base_rows, rows), base)
+
+    assert _by_id(rebuild_rows(db, delta)) == rows
+
+
+def _sent(db, snapshot: ReportSnapshot) -> None:
+    db.add(
+        SendHistory(
+            recipient_type="VENDEDOR",
+            recipient_value="João",
+            report_type="vencidos",
+            method="WHATSAPP",
+            snapshot_id=snapshot.id,
+        )
+    )
+    db.commit()
+
+
+def test_legacy_base_is_not_used_for_deltas(db):
+    _sent(db, _snapshot(db, [_legacy(_row(1))]))
+    assert _delta_base(db, "vencidos", "VENDEDOR", "João", FILTERS) is None
+
+    keyed = _snapshot(db, [_row(1)])
+    _sent(db, keyed)
+    base, rows = _delta_base(db, "vencidos", "VENDEDOR", "João", FILTERS)
+    assert (base.id, rows) == (keyed.id, [_row(1)])